@@ -0,0 +1,213 @@
+"""The batch_runner.py module steps many headless levels in parallel, spread over one worker process per core.
+    It is meant for bot-driven soak tests: every call to BatchRunner.step takes one action per level instance and
+    returns one observation per instance. Level layouts are compiled before the workers start, so every worker only
+    memory-maps the compiled level files. The operating system shares their pages between all workers, and no worker
+    parses a Tiled map or CSV file.
+
+    Run this module from the code folder to soak test every level with random bots:
+        python batch_runner.py [instances per level] [batches]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter, namedtuple
+from game_data import levels
+from level_loader import compile_level, load_compiled_layers, load_layouts
+from headless import HeadlessGame
+from simulation import unpack_controls
+
+# state of one level instance after a step, done is True when the game ended and the instance was restarted
+Observation = namedtuple('Observation', ['rect', 'health', 'coins', 'done', 'result'])
+
+
+def prepare_levels(level_indices):
+    """Compiles the levels whose compiled file is missing or older than their sources."""
+    for level in set(level_indices):
+        if load_compiled_layers(levels[level]) is None:
+            compile_level(levels[level])
+
+
+class Environment:
+    """One level played headless, restarted with a new seed whenever the game on it ends.
+
+        Attributes:
+            level: Index of the level in game_data.levels.
+            layouts: Layouts of the level, shared by all instances of the level in a worker.
+            max_updates: Number of updates after which a game that has not ended is stopped as a 'timeout'.
+            rng: Random number generator picking the seed of every new game.
+            game: HeadlessGame currently being played.
+    """
+    def __init__(self, level, layouts, max_updates, seed):
+        """Starts the first game on the level.
+
+            Parameters:
+                level: Index of the level in game_data.levels.
+                layouts: Layouts of the level.
+                max_updates: Number of updates after which a game is stopped.
+                seed: Seed of the generator picking the seed of every game.
+        """
+        self.level = level
+        self.layouts = layouts
+        self.max_updates = max_updates
+        self.rng = random.Random(seed)
+        self.game = None
+        self.reset()
+
+    def reset(self):
+        """Starts a new game on the level."""
+        self.game = HeadlessGame(self.level, self.layouts, seed=self.rng.randrange(2 ** 32))
+
+    def step(self, controls, repeat=1):
+        """Advances the game, holding the same controls for several updates.
+
+            Parameters:
+                controls: Controls held down.
+                repeat (optional): Number of updates to run. Defaults to 1.
+
+            Returns: The Observation after the last update. A game that ended is restarted after it was observed.
+        """
+        game = self.game
+        result = None
+        for _ in range(repeat):
+            result = game.step(controls)
+            if result is None and game.updates >= self.max_updates:
+                result = 'timeout'
+            if result:
+                break
+
+        observation = Observation(tuple(game.level.player.sprite.collision_rect), game.current_health,
+                                  game.coin_amount, result is not None, result)
+        if result:
+            self.reset()
+        return observation
+
+
+def work(connection, specs, max_updates):
+    """Runs the environments of one worker process until the runner closes the connection.
+
+        Parameters:
+            connection: Worker end of the pipe to the runner.
+            specs: List of (level index, seed) pairs, one per environment of the worker.
+            max_updates: Number of updates after which a game is stopped.
+    """
+    layouts = {}
+    environments = []
+    for level, seed in specs:
+        if level not in layouts:
+            layouts[level] = load_layouts(levels[level])
+        environments.append(Environment(level, layouts[level], max_updates, seed))
+    connection.send(len(environments))
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        actions, repeat = message
+        connection.send([environment.step(unpack_controls(bits), repeat)
+                         for environment, bits in zip(environments, actions)])
+    connection.close()
+
+
+class BatchRunner:
+    """Steps independent level instances in a pool of worker processes.
+        The instances are dealt to the workers in contiguous slices, so actions and observations keep the order of
+        the level indices the runner was created with.
+
+        Attributes:
+            level_indices: Level index of every instance.
+            slices: Range of instances each worker runs.
+            connections: Runner ends of the pipes to the workers.
+            processes: The worker processes.
+    """
+    def __init__(self, level_indices, workers=None, max_updates=60 * 60 * 5, seed=0):
+        """Compiles the levels and starts the workers.
+
+            Parameters:
+                level_indices: Level index of every instance, a level may appear any number of times.
+                workers (optional): Number of worker processes. Defaults to the number of cores.
+                max_updates (optional): Number of updates after which a game that has not ended is stopped.
+                    Defaults to five minutes of game time.
+                seed (optional): Seed from which the seeds of all games are derived. Defaults to 0.
+        """
+        self.level_indices = list(level_indices)
+        prepare_levels(self.level_indices)
+
+        count = len(self.level_indices)
+        workers = max(1, min(workers or os.cpu_count(), count))
+        bounds = [count * worker // workers for worker in range(workers + 1)]
+        self.slices = [range(bounds[worker], bounds[worker + 1]) for worker in range(workers)]
+
+        # forked workers also inherit the modules and assets the runner has loaded already
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        self.connections = []
+        self.processes = []
+        for instances in self.slices:
+            connection, worker_connection = context.Pipe()
+            specs = [(self.level_indices[instance], seed * count + instance) for instance in instances]
+            process = context.Process(target=work, args=(worker_connection, specs, max_updates), daemon=True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+        # wait until every worker has created its levels
+        for connection in self.connections:
+            connection.recv()
+
+    def step(self, actions, repeat=1):
+        """Advances every instance with its own controls.
+
+            Parameters:
+                actions: Sequence of controls bitmasks (see simulation.pack_controls), one per instance.
+                repeat (optional): Number of updates each action is held for. Defaults to 1.
+
+            Returns: List of Observations, one per instance.
+        """
+        for connection, instances in zip(self.connections, self.slices):
+            connection.send((bytes(actions[instances.start:instances.stop]), repeat))
+
+        observations = []
+        for connection in self.connections:
+            observations.extend(connection.recv())
+        return observations
+
+    def close(self):
+        """Stops the workers."""
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+
+if __name__ == '__main__':
+    per_level = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    batches = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    repeat = 4
+    # bitmasks the bots choose from, mostly running right and jumping
+    bot_actions = [2, 2, 2, 6, 6, 1, 5, 4, 0]
+
+    start = time.perf_counter()
+    runner = BatchRunner([level for level in levels for _ in range(per_level)])
+    started = time.perf_counter()
+
+    bot = random.Random(0)
+    results = Counter()
+    for batch in range(batches):
+        actions = [bot.choice(bot_actions) for _ in runner.level_indices]
+        for observation in runner.step(actions, repeat):
+            if observation.done:
+                results[observation.result] += 1
+    elapsed = time.perf_counter() - started
+    runner.close()
+
+    updates = batches * repeat * len(runner.level_indices)
+    print(f'{len(runner.level_indices)} instances on {len(runner.slices)} workers, started in {started - start:.2f}s')
+    print(f'{updates} updates in {elapsed:.2f}s, {updates / elapsed:.0f} updates per second')
+    print('games ended:', ', '.join(f'{result} {count}' for result, count in results.most_common()) or 'none')
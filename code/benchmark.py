@@ -0,0 +1,228 @@
+"""The benchmark.py module measures how long every level takes to build and to run a frame, without a window or sound.
+    For each level in game_data.levels it measures the wall time and the peak Python memory of Level.__init__ with
+    an empty asset cache, the p50 and p99 time of a frame (Level.update followed by Level.draw) over a scripted
+    input sequence, the mean numbers of sprites the camera drew and culled per frame, the asset cache counters of the
+    build, and the memory of the surfaces the level created itself and shares with the asset cache.
+    Whenever the game on the level ends, the level is restored to its initial state and the script goes on, so every
+    level runs the same number of frames. Peak memory is traced with tracemalloc, which sees the allocations of
+    Python objects but not the pixels of surfaces, those are allocated by SDL.
+
+    The results are written to a JSON file and compared against a stored baseline. A metric that grew by more than
+    its threshold in benchmark_thresholds (see settings.py) is reported as a regression and fails the run.
+    Run this module from the code folder:
+        python benchmark.py [--frames N] [--output results.json] [--baseline baseline.json] [--save-baseline]
+                            [--threshold metric=fraction ...]
+"""
+
+import os
+
+# select the dummy drivers before pygame is imported, so the benchmark runs on machines without a display or sound
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from time import perf_counter
+import pygame
+from settings import screen_width, screen_height, benchmark_frames, benchmark_baseline, benchmark_thresholds
+from game_data import levels
+from support import asset_cache
+from batch_runner import prepare_levels
+from headless import HeadlessGame
+from profiler import percentile
+from simulation import Controls
+from memory_report import memory_report
+
+
+def scripted_controls(update):
+    """Returns the controls of an update of the benchmark script: running right, jumping every 45 updates and
+        turning back for one second out of every four.
+    """
+    backwards = update % 240 >= 180
+    return Controls(backwards, not backwards, update % 45 == 0)
+
+
+def build_level(level):
+    """Builds a level with an empty asset cache, so every image is loaded from disk.
+
+        Returns: The HeadlessGame playing the level and the seconds it took to build.
+    """
+    asset_cache.invalidate()
+    start = perf_counter()
+    game = HeadlessGame(level, seed=0)
+    # a level built for display bakes its chunks while it loads, so the headless one bakes them here as well
+    game.level.bake()
+    return game, perf_counter() - start
+
+
+def measure_level(level, surface, frames):
+    """Measures the build and frame times of one level.
+
+        Parameters:
+            level: Index of the level in game_data.levels.
+            surface: Surface the frames are drawn on.
+            frames: Number of frames to run.
+
+        Returns: Dictionary of the metrics of the level, times in milliseconds and memory in KiB. The surface memory
+            is measured after the frames, when the chunks have been baked. The sprite counts are means per frame,
+            'culling' holds the mean [drawn, culled] sprites of every layer the camera draws. 'asset_cache' holds the
+            hits and misses of the measured build and the entries, bytes and staged images the cache held after it.
+    """
+    # the first build is only timed, tracemalloc slows down the second one that measures the memory
+    game, build_time = build_level(level)
+    tracemalloc.start()
+    # the cache counters are never reset, so the hits and misses of the build are the difference over it
+    before = asset_cache.stats()
+    game, _ = build_level(level)
+    cache = asset_cache.stats()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cache['hits'] -= before['hits']
+    cache['misses'] -= before['misses']
+
+    initial = game.snapshot()
+    restarts = 0
+    frame_times = []
+    # drawn and culled sprites of every layer summed over all frames
+    culling = {}
+    for update in range(frames):
+        start = perf_counter()
+        game.step(scripted_controls(update))
+        game.level.draw(surface)
+        frame_times.append(perf_counter() - start)
+        for layer, (drawn, culled) in game.level.camera.draw_counts.items():
+            drawn_total, culled_total = culling.get(layer, (0, 0))
+            culling[layer] = (drawn_total + drawn, culled_total + culled)
+        if game.result:
+            game.restore(initial)
+            restarts += 1
+
+    frame_times.sort()
+    surfaces = memory_report([game.level]).level_totals()[level]
+    return {
+        'init_ms': round(build_time * 1000, 3),
+        'init_peak_kib': round(peak / 1024, 1),
+        'frame_p50_ms': round(percentile(frame_times, 0.5) * 1000, 4),
+        'frame_p99_ms': round(percentile(frame_times, 0.99) * 1000, 4),
+        'surface_kib': round(surfaces['owned_bytes'] / 1024, 1),
+        'shared_surface_kib': round(surfaces['shared_bytes'] / 1024, 1),
+        'surface_owners_kib': {owner: round(bytes_used / 1024, 1)
+                               for owner, bytes_used in surfaces['owners'].items()},
+        'drawn_sprites': round(sum(drawn for drawn, _ in culling.values()) / frames, 1),
+        'culled_sprites': round(sum(culled for _, culled in culling.values()) / frames, 1),
+        'culling': {layer: [round(drawn / frames, 1), round(culled / frames, 1)]
+                    for layer, (drawn, culled) in culling.items()},
+        'asset_cache': cache,
+        'frames': frames,
+        'restarts': restarts,
+    }
+
+
+def run_benchmark(frames=benchmark_frames):
+    """Measures every level.
+
+        Parameters:
+            frames (optional): Number of frames run on each level. Defaults to benchmark_frames from the settings.
+
+        Returns: Dictionary with the machine the benchmark ran on and the metrics of every level, keyed by level index
+            as a string.
+    """
+    # only the display is started, without the mixer the levels load silent stand-ins for their sounds
+    pygame.display.init()
+    surface = pygame.display.set_mode((screen_width, screen_height))
+    prepare_levels(levels)
+    results = {
+        'machine': {'python': platform.python_version(), 'pygame': pygame.version.ver, 'platform': platform.platform(),
+                    'time': time.strftime('%Y-%m-%d %H:%M:%S')},
+        'levels': {str(level): measure_level(level, surface, frames) for level in levels},
+    }
+    pygame.quit()
+    return results
+
+
+def compare(results, baseline, thresholds=benchmark_thresholds):
+    """Compares benchmark results against a baseline.
+
+        Parameters:
+            results: Results returned by run_benchmark.
+            baseline: Results of an earlier run.
+            thresholds (optional): Dictionary mapping a metric to the fraction by which it may grow before it counts
+                as a regression. Defaults to benchmark_thresholds from the settings.
+
+        Returns: List of (level, metric, baseline value, new value) tuples, one per regression.
+    """
+    regressions = []
+    for level, metrics in results['levels'].items():
+        old_metrics = baseline['levels'].get(level)
+        if old_metrics is None:
+            continue
+        for metric, threshold in thresholds.items():
+            old, new = old_metrics.get(metric), metrics.get(metric)
+            if old is not None and new is not None and new > old * (1 + threshold):
+                regressions.append((level, metric, old, new))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    """Prints one line per level, with the change against the baseline when there is one."""
+    metrics = ['init_ms', 'init_peak_kib', 'frame_p50_ms', 'frame_p99_ms', 'surface_kib']
+    print('level  ' + ''.join(f'{metric:>22}' for metric in metrics))
+    for level, values in results['levels'].items():
+        old_values = baseline['levels'].get(level, {}) if baseline else {}
+        columns = []
+        for metric in metrics:
+            column = f'{values[metric]:.3f}'
+            if old_values.get(metric):
+                column += f' ({(values[metric] / old_values[metric] - 1) * 100:+.0f}%)'
+            columns.append(f'{column:>22}')
+        print(f'{level:<7}' + ''.join(columns))
+
+
+def parse_thresholds(overrides):
+    """Returns benchmark_thresholds with the metric=fraction overrides given on the command line applied."""
+    thresholds = dict(benchmark_thresholds)
+    for override in overrides:
+        metric, _, fraction = override.partition('=')
+        thresholds[metric] = float(fraction)
+    return thresholds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks building and running every level headless.')
+    parser.add_argument('--frames', type=int, default=benchmark_frames, help='frames run on each level')
+    parser.add_argument('--output', help='file the results are written to')
+    parser.add_argument('--baseline', default=benchmark_baseline, help='results the run is compared against')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', action='append', default=[], metavar='METRIC=FRACTION',
+                        help='allowed growth of a metric, for example frame_p99_ms=0.5')
+    arguments = parser.parse_args()
+
+    results = run_benchmark(arguments.frames)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    baseline = None
+    if not arguments.save_baseline and os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+
+    if arguments.save_baseline:
+        os.makedirs(os.path.dirname(arguments.baseline) or '.', exist_ok=True)
+        with open(arguments.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print('baseline saved to', arguments.baseline)
+    elif baseline is None:
+        print('no baseline at', arguments.baseline, '- store one with --save-baseline')
+    else:
+        regressions = compare(results, baseline, parse_thresholds(arguments.threshold))
+        for level, metric, old, new in regressions:
+            print(f'REGRESSION level {level} {metric}: {old} -> {new}')
+        if regressions:
+            sys.exit(1)
+        print('no regressions against', arguments.baseline)
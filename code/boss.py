@@ -1,9 +1,8 @@
 """This module defines a class representing the boss enemy in the game."""
 
-import pygame
 from tiles import AnimatedTile
-from support import import_folder
-from math import sin
+from support import import_folder, import_sound
+from effects import Blink
 
 
 class Boss(AnimatedTile):
@@ -13,19 +12,20 @@ class Boss(AnimatedTile):
         Attributes:
             speed: Speed of the boss.
             health: Health points of the boss.
-            invincible: Flag indicating whether the boss is invincible.
             invincibility_duration: Duration of invincibility after being hit.
-            hurt_time: Time at which the boss was last hurt.
+            blink: Blink effect that times the invincibility and makes the boss flash while it lasts.
             alive: Flag indicating whether the boss is alive.
             hit_sound: Sound played when the boss is hit.
+            clock: SimulationClock of the level.
     """
-    def __init__(self, size, x, y):
+    def __init__(self, size, x, y, clock):
         """Initializes a Boss object with a specified size, position, and initial attributes.
 
             Parameters:
                 size: Size of the boss.
                 x: X-coordinate of the boss.
                 y: Y-coordinate of the boss.
+                clock: SimulationClock of the level, times the invincibility.
         """
         super().__init__(size, x, y, '../graphics/enemy/boss idle')
         self.rect.y -= 120
@@ -34,13 +34,12 @@ class Boss(AnimatedTile):
         self.run_left_frames = import_folder('../graphics/enemy/boss run left')
         self.run_right_frames = import_folder('../graphics/enemy/boss run right')
         self.health = 30
-        self.invincible = False
         self.invincibility_duration = 2000
-        self.hurt_time = 0
+        self.blink = Blink(self.invincibility_duration)
         self.alive = True
+        self.clock = clock
 
-        self.hit_sound = pygame.mixer.Sound('../audio/effects/hit.wav')
-        self.hit_sound.set_volume(0.7)
+        self.hit_sound = import_sound('../audio/effects/hit.wav', 0.7)
 
     def move_right(self):
         """Moves the boss to the right and changes the animation frames."""
@@ -58,39 +57,37 @@ class Boss(AnimatedTile):
 
     def take_damage(self):
         """Inflicts damage on the boss and activates invincibility."""
-        if not self.invincible:
+        if not self.blink.active:
             self.hit_sound.play()
             self.health -= 10
-            self.invincible = True
-            self.hurt_time = pygame.time.get_ticks()
+            self.blink.start(self.clock.get_ticks())
             print("boss health:", self.health)
 
     def invincibility_timer(self):
         """ Manages the invincibility timer for the boss."""
-        if self.invincible:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.hurt_time >= self.invincibility_duration:
-                self.invincible = False
+        self.blink.update(self.clock.get_ticks())
 
     def wave_value(self):
-        """Calculates a wave value for use in effects.
+        """Returns the alpha value of the blinking effect, worked out by invincibility_timer.
 
             Returns:
                 Integer representing the alpha value.
         """
-        value = sin(pygame.time.get_ticks())
-        if value >= 0:
-            return 255
-        else:
-            return 0
+        return self.blink.alpha
 
     def invincibility_blink(self):
-        """Implements blinking effect during invincibility."""
-        if self.invincible:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
+        """Implements blinking effect during invincibility by showing a transparent frame in place of the current one."""
+        self.image = self.blink.apply(self.image)
+
+    def snapshot(self):
+        """Returns the position, health and invincibility of the boss as a tuple, see restore."""
+        return super().snapshot(), self.health, self.blink.snapshot()
+
+    def restore(self, state):
+        """Puts the boss back into a state returned by snapshot."""
+        tile_state, self.health, blink_state = state
+        super().restore(tile_state)
+        self.blink.restore(blink_state)
 
     def is_alive(self):
         """Checks if the boss is alive.
@@ -117,15 +114,8 @@ class Boss(AnimatedTile):
         else:
             return False
 
-    def update(self, x_shift, surface=None):
-        """Updates the boss's position and state.
-
-            Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the boss on. Defaults to None.
-        """
-        self.rect.x += x_shift
+    def update(self):
+        """Updates the boss's animation and state."""
+        self.invincibility_timer()
         self.animate()
         self.invincibility_blink()
-        self.invincibility_timer()
-        self.wave_value()
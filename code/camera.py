@@ -0,0 +1,157 @@
+"""The camera.py module defines the camera that scrolls a level horizontally.
+    All sprites of a level keep fixed world coordinates. The camera only holds the horizontal offset of the screen
+    within the world and applies it when sprites are drawn or when the visible area is queried, so scrolling no longer
+    has to move every sprite in the level.
+    Sprites outside the screen (plus a margin) are culled before drawing. Layers that never move are indexed by their
+    x-coordinate, so finding their visible sprites costs the same however long the level is.
+    Frames can be rendered between two simulation updates. The camera then draws its own offset and the remembered
+    moving sprites interpolated between their positions before and after the last update.
+"""
+
+from bisect import bisect_left, bisect_right
+import pygame
+from settings import cull_margin
+
+
+class Camera:
+    """Represents the part of the level that is visible on the screen.
+
+        Attributes:
+            offset_x: World x-coordinate of the left edge of the screen.
+            width: Width of the visible area.
+            height: Height of the visible area.
+            margin: Distance outside the visible area within which sprites are still drawn.
+            draw_counts: Number of drawn and culled sprites of each layer in the last frame, as (drawn, culled).
+            static_index: Sprites of each static group sorted by their left edge, used to find the visible ones.
+            previous_offset_x: Offset before the last update.
+            previous_positions: Dictionary mapping each remembered moving sprite to its midbottom before the last update.
+            alpha: Progress from the last update to the next one at which the current frame is drawn, between 0 and 1.
+            draw_offset_x: Offset the current frame is drawn with, interpolated by alpha.
+    """
+    def __init__(self, width, height, margin=cull_margin):
+        """Initializes a camera looking at the start of the level.
+
+            Parameters:
+                width: Width of the visible area.
+                height: Height of the visible area.
+                margin (optional): Distance outside the visible area within which sprites are still drawn.
+                    Defaults to cull_margin from the settings.
+        """
+        self.offset_x = 0
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.draw_counts = {}
+        self.static_index = {}
+        self.previous_offset_x = 0
+        self.previous_positions = {}
+        self.alpha = 1
+        self.draw_offset_x = 0
+
+    @property
+    def visible_rect(self):
+        """Rectangle in world coordinates covering the area shown on the screen."""
+        return pygame.Rect(self.offset_x, 0, self.width, self.height)
+
+    def scroll(self, amount):
+        """Moves the camera horizontally.
+
+            Parameters:
+                amount: Number of pixels to move, positive values scroll to the right.
+        """
+        self.offset_x += amount
+
+    def remember(self, groups):
+        """Stores the offset and the positions of moving sprites before an update, to interpolate from.
+
+            Parameters:
+                groups: Sprite groups whose sprites move during updates.
+        """
+        self.previous_offset_x = self.offset_x
+        self.previous_positions = {sprite: sprite.rect.midbottom for group in groups for sprite in group}
+
+    def interpolate(self, alpha):
+        """Sets how far between the last update and the next one the following draws are.
+
+            Parameters:
+                alpha: 0 draws the state before the last update, 1 the state after it.
+        """
+        self.alpha = alpha
+        self.draw_offset_x = round(self.previous_offset_x + (self.offset_x - self.previous_offset_x) * alpha)
+
+    def lag(self, sprite):
+        """Returns how far behind its current position a sprite is drawn in the current frame, as (x, y)."""
+        previous = self.previous_positions.get(sprite)
+        if previous is None or self.alpha >= 1:
+            return 0, 0
+        x, y = sprite.rect.midbottom
+        back = 1 - self.alpha
+        return round((previous[0] - x) * back), round((previous[1] - y) * back)
+
+    @property
+    def cull_rect(self):
+        """Rectangle in world coordinates covering the visible area plus the culling margin."""
+        return pygame.Rect(self.offset_x - self.margin, -self.margin,
+                           self.width + 2 * self.margin, self.height + 2 * self.margin)
+
+    def to_screen(self, rect):
+        """Returns a copy of a world rectangle moved to screen coordinates."""
+        return rect.move(-self.offset_x, 0)
+
+    def static_sprites(self, group, area):
+        """Returns the sprites of a group that never moves which overlap an area, in the group's drawing order.
+            The group is indexed by the left edge of its sprites once, and again whenever sprites were removed from it.
+
+            Parameters:
+                group: Sprite group whose sprites keep their positions.
+                area: Rectangle in world coordinates.
+        """
+        index = self.static_index.get(group)
+        if index is None or index[3] != len(group):
+            ordered = sorted(enumerate(group.sprites()), key=lambda item: item[1].rect.left)
+            lefts = [sprite.rect.left for _, sprite in ordered]
+            widest = max((sprite.rect.width for _, sprite in ordered), default=0)
+            index = (lefts, ordered, widest, len(group))
+            self.static_index[group] = index
+
+        lefts, ordered, widest, _ = index
+        start = bisect_left(lefts, area.left - widest)
+        end = bisect_right(lefts, area.right)
+        visible = [item for item in ordered[start:end] if item[1].rect.colliderect(area)]
+        visible.sort(key=lambda item: item[0])
+        return [sprite for _, sprite in visible]
+
+    def draw(self, group, surface, layer=None, static=False):
+        """Draws the sprites of a group that overlap the visible area at their position relative to the camera.
+
+            Parameters:
+                group: Sprite group to draw.
+                surface: Surface to draw the sprites on.
+                layer (optional): Name under which the drawn and culled sprites are counted. Defaults to None.
+                static (optional): Whether the sprites of the group never move, which allows indexing them.
+                    Sprites may still be removed from a static group. Defaults to False.
+        """
+        area = self.cull_rect
+        if static:
+            sprites = self.static_sprites(group, area)
+        else:
+            sprites = [sprite for sprite in group if sprite.rect.colliderect(area)]
+
+        offset_x = self.draw_offset_x
+        if static or not self.previous_positions or self.alpha >= 1:
+            surface.blits([(sprite.image, sprite.rect.move(-offset_x, 0)) for sprite in sprites], False)
+        else:
+            blits = []
+            for sprite in sprites:
+                lag_x, lag_y = self.lag(sprite)
+                blits.append((sprite.image, sprite.rect.move(lag_x - offset_x, lag_y)))
+            surface.blits(blits, False)
+        if layer:
+            self.draw_counts[layer] = (len(sprites), len(group) - len(sprites))
+
+    def culling_report(self):
+        """Returns a one line summary of the drawn and culled sprites of every layer in the last frame."""
+        drawn = sum(counts[0] for counts in self.draw_counts.values())
+        culled = sum(counts[1] for counts in self.draw_counts.values())
+        layers = ', '.join(f'{layer} {counts[0]}/{counts[0] + counts[1]}' for layer, counts in self.draw_counts.items())
+        return f'drawn {drawn}, culled {culled} ({layers})'
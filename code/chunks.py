@@ -0,0 +1,44 @@
+"""This module bakes static tile layers into a few large chunk surfaces.
+    Terrain and grass tiles never change, so instead of blitting every tile each frame they are drawn once at load time
+    into chunks one screen wide. Each frame then only blits the one or two chunks in view. The original tile sprites are
+    kept for collision detection, baking only replaces how the layer is drawn.
+"""
+
+import pygame
+from settings import chunk_width
+from tiles import StaticTile
+
+
+def bake_chunks(group, width=chunk_width):
+    """Draws the sprites of a static group into chunk sprites covering consecutive bands of the level.
+        Each chunk is only as tall as the sprites inside it, and sprites crossing a band border are drawn into both chunks.
+
+        Parameters:
+            group: Sprite group whose sprites never move or change their image.
+            width (optional): Width of a chunk. Defaults to chunk_width from the settings.
+
+        Returns: Sprite group of StaticTile chunks, in world coordinates like the baked sprites.
+    """
+    bands = {}
+    for sprite in group:
+        for band in range(sprite.rect.left // width, (sprite.rect.right - 1) // width + 1):
+            bands.setdefault(band, []).append(sprite)
+
+    chunks = pygame.sprite.Group()
+    for band, sprites in sorted(bands.items()):
+        top = min(sprite.rect.top for sprite in sprites)
+        bottom = max(sprite.rect.bottom for sprite in sprites)
+        x = band * width
+
+        chunk_surface = pygame.Surface((width, bottom - top), flags=pygame.SRCALPHA)
+        # the sprites are blitted in the group's drawing order, so overlapping tiles look the same as before
+        for sprite in sprites:
+            chunk_surface.blit(sprite.image, (sprite.rect.x - x, sprite.rect.y - top))
+        # run-length encoding skips the large transparent areas of a chunk, which makes blitting it many times faster
+        chunk_surface.set_alpha(255, pygame.RLEACCEL)
+
+        chunk = StaticTile(0, x, top, chunk_surface)
+        chunk.rect = chunk_surface.get_rect(topleft=(x, top))
+        chunks.add(chunk)
+
+    return chunks
@@ -1,14 +1,15 @@
 """This module defines classes representing background decorations such as sky, water, and clouds."""
 
 import pygame
-from settings import vertical_tile_number, tile_size, screen_width
-from tiles import AnimatedTile, StaticTile
-from support import import_folder
-from random import choice, randint
+from settings import tile_size, screen_width, cloud_parallax, water_parallax
+from support import import_folder, import_image
+import random
 
 
 class Sky:
     """Represents the sky background decoration.
+        Everything the sky shows is static, so it is composited once into a screen-sized backdrop that is drawn with a
+        single blit. The backdrop is only rendered again when the horizon or the size of the target surface changes.
 
         Attributes:
             top: Surface representing the top portion of the sky.
@@ -18,137 +19,201 @@ class Sky:
             style: Style of the sky ('level' or 'overworld').
             palms: List of palm tree surfaces and their rectangles.
             clouds: List of cloud surfaces and their rectangles.
+            backdrop: Surface with the sky rows and decorations composited, None until the first draw.
+            backdrop_key: Horizon and size the backdrop was rendered for.
     """
-    def __init__(self, horizon, style='level'):
+    def __init__(self, horizon, style='level', rng=random):
         """ Initializes a Sky object with a specified horizon and style.
 
             Parameters:
                 horizon: Y-coordinate of the horizon.
                 style (optional): Style of the sky ('level' or 'overworld'). Defaults to 'level'.
+                rng (optional): Random number generator placing the overworld decorations. Defaults to the random module.
         """
-        self.top = pygame.image.load('../graphics/decoration/sky/sky_top.png').convert()
-        self.bottom = pygame.image.load('../graphics/decoration/sky/sky_bottom.png').convert()
-        self.middle = pygame.image.load('../graphics/decoration/sky/sky_middle.png').convert()
+        self.top = import_image('../graphics/decoration/sky/sky_top.png', alpha=False)
+        self.bottom = import_image('../graphics/decoration/sky/sky_bottom.png', alpha=False)
+        self.middle = import_image('../graphics/decoration/sky/sky_middle.png', alpha=False)
         self.horizon = horizon
-
-        # stretch
-        self.top = pygame.transform.scale(self.top, (screen_width, tile_size))
-        self.bottom = pygame.transform.scale(self.bottom, (screen_width, tile_size))
-        self.middle = pygame.transform.scale(self.middle, (screen_width, tile_size))
+        self.backdrop = None
+        self.backdrop_key = None
 
         self.style = style
         if self.style == 'overworld':
             palm_surfaces = import_folder('../graphics/overworld/palms')
             self.palms = []
 
-            for surface in [choice(palm_surfaces) for image in range(10)]:
-                x = randint(0, screen_width)
-                y = (self.horizon * tile_size) + randint(50, 100)
+            for surface in [rng.choice(palm_surfaces) for image in range(10)]:
+                x = rng.randint(0, screen_width)
+                y = (self.horizon * tile_size) + rng.randint(50, 100)
                 rect = surface.get_rect(midbottom=(x, y))
                 self.palms.append((surface, rect))
 
             cloud_surfaces = import_folder('../graphics/overworld/clouds')
             self.clouds = []
 
-            for surface in [choice(cloud_surfaces) for image in range(10)]:
-                x = randint(0, screen_width)
-                y = randint(0, (self.horizon * tile_size) - 100)
+            for surface in [rng.choice(cloud_surfaces) for image in range(10)]:
+                x = rng.randint(0, screen_width)
+                y = rng.randint(0, (self.horizon * tile_size) - 100)
                 #(self.horizon * tile_size) + randint(-100, -50)
                 rect = surface.get_rect(midbottom=(x, y))
                 self.clouds.append((surface, rect))
 
-    def draw(self, surface):
-        """ Draws the sky decorations on the specified surface.
+    def render(self, size):
+        """Composites the sky rows and decorations into a new backdrop.
 
             Parameters:
-                surface: Surface to draw the decorations on.
+                size: Width and height of the backdrop.
         """
-        for row in range(vertical_tile_number):
+        width, height = size
+        # stretch
+        top = pygame.transform.scale(self.top, (width, tile_size))
+        bottom = pygame.transform.scale(self.bottom, (width, tile_size))
+        middle = pygame.transform.scale(self.middle, (width, tile_size))
+
+        self.backdrop = pygame.Surface(size)
+        for row in range(-(-height // tile_size)):
             y = row * tile_size
             if row < self.horizon:
-                surface.blit(self.top, (0, y))
+                self.backdrop.blit(top, (0, y))
             elif row == self.horizon:
-                surface.blit(self.middle, (0, y))
+                self.backdrop.blit(middle, (0, y))
             else:
-                surface.blit(self.bottom, (0, y))
+                self.backdrop.blit(bottom, (0, y))
 
         if self.style == 'overworld':
-            for palm in self.palms:
-                surface.blit(palm[0], palm[1])
+            self.backdrop.blits(self.palms, False)
+            self.backdrop.blits(self.clouds, False)
 
-            for cloud in self.clouds:
-                surface.blit(cloud[0], cloud[1])
+        self.backdrop_key = (self.horizon, size)
+
+    def draw(self, surface):
+        """ Draws the sky decorations on the specified surface.
+
+            Parameters:
+                surface: Surface to draw the decorations on.
+        """
+        size = surface.get_size()
+        if self.backdrop_key != (self.horizon, size):
+            self.render(size)
+        surface.blit(self.backdrop, (0, 0))
+
+
+class StripLayer:
+    """Background layer made of a strip of images that repeats horizontally.
+        Only one strip is kept, and the visible copies are found from the camera offset modulo the strip width,
+        so the memory and drawing cost of the layer do not depend on the width of the level. The layer scrolls
+        by its parallax factor times the camera movement, so layers further away can scroll slower than the level.
+
+        Attributes:
+            width: Width of the strip, the distance after which it repeats.
+            parallax: Factor applied to the camera offset when scrolling the layer.
+            items: List of the images in the strip and their (x, y) positions within it.
+    """
+    def __init__(self, width, parallax):
+        """Initializes an empty strip.
+
+            Parameters:
+                width: Width of the strip.
+                parallax: Factor applied to the camera offset, 1 scrolls with the level and 0 never scrolls.
+        """
+        self.width = width
+        self.parallax = parallax
+        self.items = []
+
+    def draw(self, surface, camera):
+        """Draws the copies of the strip that are visible on the surface.
+
+            Parameters:
+                surface: Surface to draw the strip on.
+                camera: Camera the layer is seen through.
+        """
+        surface_width = surface.get_width()
+        shift = int(camera.draw_offset_x * self.parallax) % self.width
+        blits = []
+        # start one strip further left, so images reaching over the end of the strip are drawn too
+        for base in range(-shift - self.width, surface_width, self.width):
+            for image, (x, y) in self.items:
+                left = base + x
+                if left < surface_width and left + image.get_width() > 0:
+                    blits.append((image, (left, y)))
+        surface.blits(blits, False)
 
 
 class Water:
-    """Represents the water background decoration.
+    """Represents the water background decoration, one animated water tile repeated across the screen.
 
         Attributes:
-            water_sprites: Sprite group containing water tiles.
+            frames: List of the water animation frames.
+            frame_index: Current index of the animation frame.
+            strip: StripLayer repeating the current frame.
     """
-    def __init__(self, top, level_width):
-        """ Initializes a Water object with water tiles.
+    def __init__(self, top, parallax=water_parallax):
+        """ Initializes a Water object.
 
             Parameters:
                 top: Y-coordinate of the top of the water.
-                level_width: Width of the level.
+                parallax (optional): Factor applied to the camera offset. Defaults to water_parallax from the settings.
         """
         water_start = -screen_width
         water_tile_width = 192
-        num_of_tiles = int((level_width + screen_width) / water_tile_width)
-        self.water_sprites = pygame.sprite.Group()
+        self.frames = import_folder('../graphics/decoration/water')
+        self.frame_index = 0
+        self.strip = StripLayer(water_tile_width, parallax)
+        self.strip.items.append((self.frames[self.frame_index], (water_start % water_tile_width, top)))
+
+    def animate(self):
+        """Advances the water animation and shows the current frame in the strip."""
+        self.frame_index += 0.15
+        if self.frame_index >= len(self.frames):
+            self.frame_index = 0
+        self.strip.items[0] = (self.frames[int(self.frame_index)], self.strip.items[0][1])
 
-        for tile in range(num_of_tiles):
-            x = tile * water_tile_width + water_start
-            y = top
-            sprite = AnimatedTile(192, x, y, '../graphics/decoration/water')
-            self.water_sprites.add(sprite)
+    def update(self):
+        """Updates the water animation."""
+        self.animate()
 
-    def draw(self, surface, shift_x):
-        """Draws the water tiles on the specified surface.
+    def draw(self, surface, camera):
+        """Draws the water on the specified surface.
 
             Parameters:
-                surface: Surface to draw the water tiles on.
-                shift_x: Horizontal shift amount.
+                surface: Surface to draw the water on.
+                camera: Camera the water is seen through.
         """
-        self.water_sprites.draw(surface)
-        self.water_sprites.update(shift_x)
+        self.strip.draw(surface, camera)
 
 
 class Clouds:
-    """Represents the clouds background decoration.
+    """Represents the clouds background decoration, a strip of randomly placed clouds that repeats.
 
         Attributes:
-            cloud_sprites: Sprite group containing cloud tiles.
+            strip: StripLayer holding the clouds.
     """
-    def __init__(self, horizon, level_width, cloud_number):
-        """Initializes a Clouds object with cloud tiles.
+    def __init__(self, horizon, cloud_number, strip_width=2 * screen_width, parallax=cloud_parallax, rng=random):
+        """Initializes a Clouds object with randomly placed clouds.
 
             Parameters:
                 horizon: Y-coordinate of the horizon.
-                level_width: Width of the level.
-                cloud_number: Number of cloud tiles to generate.
+                cloud_number: Number of clouds in the strip.
+                strip_width (optional): Width after which the clouds repeat. Defaults to two screen widths.
+                parallax (optional): Factor applied to the camera offset. Defaults to cloud_parallax from the settings.
+                rng (optional): Random number generator placing the clouds. Defaults to the random module.
         """
         cloud_surf_list = import_folder('../graphics/decoration/clouds')
-        min_x = -screen_width
-        max_x = level_width + screen_width
         min_y = 0
         max_y = horizon
-        self.cloud_sprites = pygame.sprite.Group()
+        self.strip = StripLayer(strip_width, parallax)
 
         for cloud in range(cloud_number):
-            cloud = choice(cloud_surf_list)
-            x = randint(min_x, max_x)
-            y = randint(min_y, max_y)
-            sprite = StaticTile(0, x, y, cloud)
-            self.cloud_sprites.add(sprite)
+            cloud = rng.choice(cloud_surf_list)
+            x = rng.randint(0, strip_width - 1)
+            y = rng.randint(min_y, max_y)
+            self.strip.items.append((cloud, (x, y)))
 
-    def draw(self, surface, shift_x):
-        """ Draws the cloud tiles on the specified surface.
+    def draw(self, surface, camera):
+        """ Draws the clouds on the specified surface.
 
             Parameters:
-                surface: Surface to draw the cloud tiles on.
-                shift_x: Horizontal shift amount.
+                surface: Surface to draw the clouds on.
+                camera: Camera the clouds are seen through.
         """
-        self.cloud_sprites.draw(surface)
-        self.cloud_sprites.update(shift_x)
+        self.strip.draw(surface, camera)
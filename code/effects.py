@@ -0,0 +1,78 @@
+"""This module defines visual effects that change how a sprite is shown without modifying its animation frames.
+    Animation frames are shared between all sprites through the asset cache, so an effect never changes a frame
+    itself. It hands out another surface to show in its place instead.
+"""
+
+import pygame
+from math import sin
+
+# fully transparent surfaces shown instead of a frame while it is blinked out, keyed by frame size
+hidden_frames = {}
+
+
+def hidden_frame(size):
+    """Returns the shared fully transparent surface of a given size."""
+    frame = hidden_frames.get(size)
+    if frame is None:
+        frame = pygame.Surface(size, pygame.SRCALPHA)
+        hidden_frames[size] = frame
+    return frame
+
+
+class Blink:
+    """Timed blinking effect shown while a sprite is invincible.
+        A single timer drives both how long the effect lasts and whether the sprite is currently shown,
+        which is worked out once per update instead of every time it is needed.
+
+        Attributes:
+            duration: Duration of the effect in milliseconds.
+            start_time: Time at which the effect was last started.
+            active: Boolean indicating whether the effect is running.
+            visible: Boolean indicating whether the sprite is shown in the current update.
+    """
+    def __init__(self, duration):
+        """Initializes an inactive Blink effect.
+
+            Parameters:
+                duration: Duration of the effect in milliseconds.
+        """
+        self.duration = duration
+        self.start_time = 0
+        self.active = False
+        self.visible = True
+
+    def start(self, time):
+        """Starts the effect.
+
+            Parameters:
+                time: Current time in milliseconds.
+        """
+        self.start_time = time
+        self.active = True
+
+    def update(self, time):
+        """Ends the effect once its duration has passed and works out whether the sprite is shown.
+
+            Parameters:
+                time: Current time in milliseconds.
+        """
+        if self.active and time - self.start_time >= self.duration:
+            self.active = False
+        self.visible = not self.active or sin(time) >= 0
+
+    def snapshot(self):
+        """Returns the timer state of the effect as a tuple, see restore."""
+        return self.start_time, self.active, self.visible
+
+    def restore(self, state):
+        """Puts the effect back into a state returned by snapshot."""
+        self.start_time, self.active, self.visible = state
+
+    @property
+    def alpha(self):
+        """Alpha value the sprite is shown with in the current update."""
+        return 255 if self.visible else 0
+
+    def apply(self, frame):
+        """Returns the surface to show for an animation frame, the frame itself or a transparent one of the same size."""
+        return frame if self.visible else hidden_frame(frame.get_size())
@@ -1,8 +1,8 @@
 """This module defines a class representing enemy walkers that can move and interact with the player."""
 
-import pygame
 from tiles import AnimatedTile
-from random import randint
+import random
+from support import import_flipped_folder
 
 
 class Enemy(AnimatedTile):
@@ -11,18 +11,21 @@ class Enemy(AnimatedTile):
 
         Attributes:
             speed (int): Speed of the enemy entity.
+            flipped_frames: Animation frames mirrored to face right, built once at load time.
     """
-    def __init__(self, size, x, y):
+    def __init__(self, size, x, y, rng=random):
         """Initializes an Enemy object with a specified size and position.
 
             Parameters:
                 size: Size of the enemy entity.
                 x: X-coordinate of the enemy entity.
                 y: Y-coordinate of the enemy entity.
+                rng (optional): Random number generator picking the speed. Defaults to the random module.
         """
         super().__init__(size, x, y, '../graphics/enemy/run')
+        self.flipped_frames = import_flipped_folder('../graphics/enemy/run')
         self.rect.y += size - self.image.get_size()[1]
-        self.speed = randint(3, 5)
+        self.speed = rng.randint(3, 5)
 
     def move(self):
         """Moves the enemy entity horizontally according to its speed."""
@@ -31,20 +34,23 @@ class Enemy(AnimatedTile):
     def reverse_image(self):
         """Reverses the image of the enemy entity if it is moving in the opposite direction."""
         if self.speed > 0:
-            self.image = pygame.transform.flip(self.image, True, False)
+            self.image = self.flipped_frames[int(self.frame_index)]
 
     def reverse(self):
         """Reverses the direction of movement of the enemy entity."""
         self.speed *= -1
 
-    def update(self, x_shift, surface=None):
-        """Updates the position and animation of the enemy entity.
+    def snapshot(self):
+        """Returns the position, speed and animation state of the enemy as a tuple, see restore."""
+        return super().snapshot(), self.speed
 
-            Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the enemy entity on. Defaults to None.
-        """
-        self.rect.x += x_shift
+    def restore(self, state):
+        """Puts the enemy back into a state returned by snapshot."""
+        tile_state, self.speed = state
+        super().restore(tile_state)
+
+    def update(self):
+        """Updates the position and animation of the enemy entity."""
         self.animate()
         self.move()
         self.reverse_image()
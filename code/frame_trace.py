@@ -0,0 +1,120 @@
+"""The frame_trace.py module records the spans of the last frames into a ring buffer and saves them as a trace.
+    The saved file uses the Chrome trace event format, so it opens in Perfetto (ui.perfetto.dev) or chrome://tracing
+    and shows every frame, update, draw, level phase and level construction on a timeline. Traces can be attached to
+    bug reports to show level-load hitches and collision spikes as they happened on the player's machine.
+    Pressing the trace_key in game starts recording, pressing it again saves the buffer, see profiler.py. Only the
+    trace_files_kept most recent traces are kept in the trace_folder.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from settings import trace_buffer_size, trace_folder, trace_files_kept
+from support import remove_oldest_files
+
+
+class Tracer:
+    """Ring buffer of the most recent spans. Once it is full, every new span replaces the oldest one.
+        Spans are appended from the main thread and from the preloader thread, which a deque allows without a lock.
+
+        Attributes:
+            enabled: Whether spans are recorded.
+            events: Deque of (name, category, start, end, thread id, args) tuples, start and end are perf_counter times.
+            origin: perf_counter time the timestamps of a saved trace are measured from.
+    """
+    def __init__(self, capacity=trace_buffer_size):
+        """Initializes an empty, disabled tracer.
+
+            Parameters:
+                capacity (optional): Maximum number of spans kept. Defaults to trace_buffer_size from the settings.
+        """
+        self.enabled = False
+        self.events = deque(maxlen=capacity)
+        self.origin = perf_counter()
+
+    def start(self):
+        """Forgets the recorded spans and starts recording new ones."""
+        self.events.clear()
+        self.enabled = True
+
+    def stop(self):
+        """Stops recording spans, the recorded ones are kept."""
+        self.enabled = False
+
+    def add(self, name, start, end, category='phase', args=None):
+        """Records a finished span.
+
+            Parameters:
+                name: Name of the span.
+                start: perf_counter time at which the span started.
+                end: perf_counter time at which the span ended.
+                category (optional): Category of the span. Defaults to 'phase'.
+                args (optional): Dictionary of values shown with the span. Defaults to None.
+        """
+        self.events.append((name, category, start, end, threading.get_ident(), args))
+
+    @contextmanager
+    def span(self, name, category='span', **args):
+        """Context manager recording the code it wraps as a span, if the tracer is enabled.
+
+            Parameters:
+                name: Name of the span.
+                category (optional): Category of the span. Defaults to 'span'.
+                args: Values shown with the span.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, perf_counter(), category, args or None)
+
+    def trace_events(self):
+        """Returns the recorded spans as a list of complete ('X') events of the Chrome trace event format."""
+        pid = os.getpid()
+        main_thread = threading.main_thread().ident
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'Quest For Booty'}}]
+        threads = set()
+        for name, category, start, end, thread, args in list(self.events):
+            # both ends are rounded to the same grid, so spans that follow each other do not overlap in the trace
+            start = round((start - self.origin) * 1e6, 1)
+            end = round((end - self.origin) * 1e6, 1)
+            event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': thread, 'ts': start,
+                     'dur': round(end - start, 1)}
+            if args:
+                event['args'] = args
+            events.append(event)
+            threads.add(thread)
+        for thread in threads:
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread,
+                           'args': {'name': 'main' if thread == main_thread else 'preloader'}})
+        return events
+
+    def save(self, path=None):
+        """Writes the recorded spans to a JSON trace file.
+
+            Parameters:
+                path (optional): Path of the file. Defaults to a new file in trace_folder from the settings,
+                    the oldest traces in the folder are then deleted to keep trace_files_kept of them.
+
+            Returns: Path of the written file.
+        """
+        prune = path is None
+        if prune:
+            os.makedirs(trace_folder, exist_ok=True)
+            path = f'{trace_folder}/trace_{time.strftime("%Y%m%d-%H%M%S")}.json'
+
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, file)
+        if prune:
+            remove_oldest_files(trace_folder, '.json', trace_files_kept)
+        return path
+
+
+tracer = Tracer()
@@ -1,3 +1,7 @@
+# names of the layout layers every level provides, in the order they are packed into a compiled level file
+level_layers = ('terrain', 'coins', 'health', 'fg_palms', 'bg_palms', 'crates', 'enemies', 'shell', 'constraints',
+                'player', 'grass', 'moving platform', 'spikes', 'treasure', 'boss')
+
 level_0 = {
     'terrain' : '../levels/level 0/level_0_terrain.csv',
     'coins' : '../levels/level 0/level_0_coins.csv',
@@ -14,6 +18,8 @@ level_0 = {
     'spikes' : '../levels/level 0/level_0_spikes.csv',
     'treasure': '../levels/level 0/level_0_treasure.csv',
     'boss': '../levels/level 0/level_0_boss.csv',
+    'compiled' : '../levels/level 0/level_0.lvl',
+    'tmx' : '../levels/level data/level_0.tmx',
     'node_pos' : (110, 400),
     'unlock' : 1,
     'node_graphics' : '../graphics/overworld/0',
@@ -36,6 +42,8 @@ level_1 = {
     'spikes' : '../levels/level 1/level_1_spikes.csv',
     'treasure': '../levels/level 1/level_1_treasure.csv',
     'boss': '../levels/level 1/level_1_boss.csv',
+    'compiled' : '../levels/level 1/level_1.lvl',
+    'tmx' : '../levels/level data/level_1.tmx',
     'node_pos' : (300, 220),
     'unlock' : 2,
     'node_graphics' : '../graphics/overworld/1',
@@ -58,6 +66,8 @@ level_2 = {
     'spikes' : '../levels/level 2/level_2_spikes.csv',
     'treasure': '../levels/level 2/level_2_treasure.csv',
     'boss': '../levels/level 2/level_2_boss.csv',
+    'compiled' : '../levels/level 2/level_2.lvl',
+    'tmx' : '../levels/level data/level_2.tmx',
     'node_pos' : (480, 610),
     'unlock' : 3,
     'node_graphics' : '../graphics/overworld/2',
@@ -80,6 +90,8 @@ level_3 = {
     'spikes' : '../levels/level 3/level_3_spikes.csv',
     'treasure' : '../levels/level 3/level_3_treasure.csv',
     'boss': '../levels/level 3/level_3_boss.csv',
+    'compiled' : '../levels/level 3/level_3.lvl',
+    'tmx' : '../levels/level data/level_3.tmx',
     'node_pos' : (610, 350),
     'unlock' : 4,
     'node_graphics' : '../graphics/overworld/3',
@@ -102,6 +114,8 @@ level_4 = {
     'spikes' : '../levels/level 4/level_4_spikes.csv',
     'treasure' : '../levels/level 4/level_4_treasure.csv',
     'boss' : '../levels/level 4/level_4_boss.csv',
+    'compiled' : '../levels/level 4/level_4.lvl',
+    'tmx' : '../levels/level data/level_4.tmx',
     'node_pos' : (880, 210),
     'unlock' : 5,
     'node_graphics' : '../graphics/overworld/4',
@@ -124,6 +138,8 @@ level_5 = {
     'spikes' : '../levels/level 5/level_5_spikes.csv',
     'treasure' : '../levels/level 5/level_5_treasure.csv',
     'boss' : '../levels/level 5/level_5_boss.csv',
+    'compiled' : '../levels/level 5/level_5.lvl',
+    'tmx' : '../levels/level data/level_5.tmx',
     'node_pos' : (1050, 400),
     'unlock' : 6,
     'node_graphics' : '../graphics/overworld/5',
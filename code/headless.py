@@ -0,0 +1,111 @@
+"""The headless.py module plays levels without a window, sound or keyboard.
+    It is meant for automated playtesting and balance regression runs: a level is stepped with injected controls
+    as fast as the simulation allows, instead of once per displayed frame.
+
+    Run this module from the code folder to step a level while holding right and jumping, and print the outcome:
+        python headless.py [level] [updates]
+"""
+
+import sys
+import time
+from level import Level
+from simulation import Controls, NO_CONTROLS
+
+
+class HeadlessGame:
+    """Plays one level without a display, standing in for the Game class.
+        It keeps the player's health and coins like Game does and records how the level ended.
+
+        Attributes:
+            max_health: Maximum health points of the player.
+            current_health: Current health points of the player.
+            coin_amount: Number of coins collected.
+            updates: Number of updates the level has been stepped.
+            result: How the level ended, 'won', 'fell' or 'died', None while it is still being played.
+            level: The Level being played.
+    """
+    def __init__(self, current_level, layouts=None, max_health=100, seed=None, health=None, coins=0):
+        """Creates the level without a display surface.
+
+            Parameters:
+                current_level: Index of the level in game_data.levels.
+                layouts (optional): Layouts of the level prepared in advance. Defaults to None, which loads them.
+                max_health (optional): Maximum health points of the player. Defaults to 100.
+                seed (optional): Seed of the level's random number generator. Defaults to None, which picks one.
+                health (optional): Health points the player starts with. Defaults to None, which means max_health.
+                coins (optional): Number of coins collected before the level. Defaults to 0.
+        """
+        self.max_health = max_health
+        self.current_health = max_health if health is None else health
+        self.coin_amount = coins
+        self.updates = 0
+        self.result = None
+        self.level = Level(current_level, None, self.create_overworld, self.change_coins, self.change_health, layouts,
+                           seed)
+
+    def create_overworld(self, current_level, new_max_level):
+        """Records that the level ended, the player fell off the screen when no level was unlocked."""
+        if self.result is None:
+            self.result = 'fell' if new_max_level == 0 else 'won'
+
+    def change_coins(self, amount):
+        """Updates the coin count by the specified amount."""
+        self.coin_amount += amount
+
+    def change_health(self, amount):
+        """Updates the player's health by the specified amount."""
+        if self.current_health != self.max_health or amount < 0:
+            self.current_health += amount
+
+    def step(self, controls=NO_CONTROLS):
+        """Advances the level by one update.
+
+            Parameters:
+                controls (optional): Controls held down during the update. Defaults to no controls.
+
+            Returns: The result of the level, None while it is still being played.
+        """
+        self.level.update(controls)
+        self.updates += 1
+        if self.result is None and self.current_health <= 0:
+            self.result = 'died'
+        return self.result
+
+    def snapshot(self):
+        """Captures the state of the level together with the player's health and coins, see Level.snapshot."""
+        return self.level.snapshot(), self.current_health, self.coin_amount, self.updates, self.result
+
+    def restore(self, snapshot):
+        """Puts the game back into a state captured by snapshot."""
+        level_snapshot, self.current_health, self.coin_amount, self.updates, self.result = snapshot
+        self.level.restore(level_snapshot)
+
+    def play(self, inputs):
+        """Steps the level with a sequence of controls until it ends or the controls run out.
+
+            Parameters:
+                inputs: Iterable of Controls, one per update.
+
+            Returns: The result of the level, None if it had not ended yet.
+        """
+        for controls in inputs:
+            if self.step(controls):
+                break
+        return self.result
+
+
+if __name__ == '__main__':
+    level_index = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 3600
+
+    start = time.perf_counter()
+    game = HeadlessGame(level_index)
+    created = time.perf_counter()
+    # hold right and jump every 45 updates
+    game.play(Controls(False, True, update % 45 == 0) for update in range(updates))
+    elapsed = time.perf_counter() - created
+
+    print(f'level {level_index}: {game.result or "still playing"} after {game.updates} updates, '
+          f'health {game.current_health}, coins {game.coin_amount}')
+    print(f'created in {created - start:.3f}s, {game.updates / elapsed:.0f} updates per second '
+          f'({game.updates / elapsed / 60:.0f}x real time)')
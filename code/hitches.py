@@ -0,0 +1,110 @@
+"""The hitches.py module detects frames that take longer than the frame budget and records what the game was doing.
+    clock.tick hides how often a frame overruns, because the next frame simply starts late. The HitchDetector checks
+    the time every frame took, and for each slow one it records the game status, the current level, the sprite counts
+    of every group of the level, the particle effects playing and the phase that took longest according to the
+    profiler, which times the phases of every frame as long as hitch_phase_timing is set in the settings. On exit the
+    game prints a summary that shows whether the hitches came from loading, collision handling, updating or
+    rendering.
+"""
+
+from collections import Counter, deque, namedtuple
+from settings import hitch_budget, hitch_log_size
+from profiler import profiler
+
+# context of one frame that went over the budget
+Hitch = namedtuple('Hitch', ['frame', 'milliseconds', 'status', 'level', 'sprite_counts', 'particles', 'phase',
+                             'phase_milliseconds', 'cause'])
+
+# the subsystem the slowest phase of a hitch belongs to, phases not listed count as 'update'
+PHASE_CAUSES = {
+    'create level (self)': 'loading', 'create overworld (self)': 'loading', 'chunk baking': 'loading',
+    'collision grid': 'collision', 'horizontal collisions': 'collision', 'vertical collisions': 'collision',
+    'spike collisions': 'collision', 'enemy collisions': 'collision', 'enemy sight': 'collision',
+    'pickups': 'collision',
+    'draw (self)': 'rendering', 'draw sky': 'rendering', 'draw decoration': 'rendering', 'draw particles': 'rendering',
+    'draw terrain': 'rendering', 'draw sprites': 'rendering', 'draw player': 'rendering', 'draw water': 'rendering',
+    'draw ui': 'rendering', 'draw overworld': 'rendering', 'profiler overlay': 'rendering',
+    'display update': 'rendering',
+    'events': 'events', 'recording': 'recording',
+}
+
+
+class HitchDetector:
+    """Counts the frames over the budget and keeps the context of the most recent ones.
+
+        Attributes:
+            budget: Milliseconds a frame may take.
+            frames: Number of frames checked.
+            hitches: Deque of the most recent Hitches.
+            count: Number of frames over the budget.
+            worst: The slowest Hitch so far, None before the first one.
+            causes: Counter of the hitches per cause.
+            phases: Counter of the hitches per slowest phase.
+            places: Counter of the hitches per game status and level.
+    """
+    def __init__(self, budget=hitch_budget, log_size=hitch_log_size):
+        """Initializes a detector without any hitches.
+
+            Parameters:
+                budget (optional): Milliseconds a frame may take. Defaults to hitch_budget from the settings.
+                log_size (optional): Number of hitches whose context is kept. Defaults to hitch_log_size from
+                    the settings.
+        """
+        self.budget = budget
+        self.frames = 0
+        self.hitches = deque(maxlen=log_size)
+        self.count = 0
+        self.worst = None
+        self.causes = Counter()
+        self.phases = Counter()
+        self.places = Counter()
+
+    def check(self, milliseconds, game):
+        """Records the context of a frame if it went over the budget.
+
+            Parameters:
+                milliseconds: Time the frame took, without the time spent waiting for the next frame.
+                game: The Game the frame was rendered for.
+        """
+        self.frames += 1
+        if milliseconds <= self.budget:
+            return
+
+        level = game.level if game.status == 'level' else None
+        slowest = profiler.slowest_phase()
+        phase, phase_milliseconds = slowest if slowest else (None, 0)
+        hitch = Hitch(self.frames, milliseconds, game.status,
+                      level.current_level if level else game.overworld.current_level,
+                      level.sprite_counts() if level else {}, level.particles.alive_count() if level else 0,
+                      phase, phase_milliseconds, PHASE_CAUSES.get(phase, 'update') if phase else 'unknown')
+
+        self.hitches.append(hitch)
+        self.count += 1
+        if self.worst is None or milliseconds > self.worst.milliseconds:
+            self.worst = hitch
+        self.causes[hitch.cause] += 1
+        self.phases[phase] += 1
+        self.places[(hitch.status, hitch.level)] += 1
+
+    def report(self):
+        """Returns a human readable summary of the hitches."""
+        if not self.frames:
+            return 'hitches: no frames checked'
+        lines = [f'hitches: {self.count} of {self.frames} frames ({self.count / self.frames * 100:.1f}%) '
+                 f'took longer than {self.budget:.1f} ms']
+        if not self.count:
+            return lines[0]
+
+        lines.append('  by cause: ' + ', '.join(f'{cause} {count}' for cause, count in self.causes.most_common()))
+        lines.append('  by slowest phase: ' + ', '.join(f'{phase or "unknown"} {count}'
+                                                        for phase, count in self.phases.most_common(5)))
+        lines.append('  by place: ' + ', '.join(f'{status} {level} {count}'
+                                                for (status, level), count in self.places.most_common()))
+        worst = self.worst
+        lines.append(f'  worst: frame {worst.frame}, {worst.milliseconds:.1f} ms in {worst.status} {worst.level}, '
+                     f'slowest phase {worst.phase or "unknown"} {worst.phase_milliseconds:.1f} ms, '
+                     f'{worst.particles} particles playing')
+        if worst.sprite_counts:
+            largest = sorted(worst.sprite_counts.items(), key=lambda item: item[1], reverse=True)[:5]
+            lines.append('  worst frame sprites: ' + ', '.join(f'{name} {count}' for name, count in largest))
+        return '\n'.join(lines)
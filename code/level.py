@@ -2,8 +2,10 @@
 which is responsible for managing the game logic, rendering, and interactions within individual levels of the game.
 """
 
+import random
 import pygame
-from support import import_csv_layout, import_cut_graphics
+from support import import_image, import_sound, Tileset
+from level_loader import load_layouts
 from settings import tile_size, screen_height, screen_width
 from tiles import Tile, StaticTile, Crate, Coin, Palm, Spikes, RumBottle, Treasure
 from enemy import Enemy
@@ -11,42 +13,59 @@ from shell_enemy import Shell
 from boss import Boss
 from moving_platform import MovingPlatform
 from decoration import Sky, Water, Clouds
+from camera import Camera
+from chunks import bake_chunks
+from spatial import SpatialHash
 from player import Player
-from particles import ParticleEffect
+from particles import ParticleSystem
+from simulation import SimulationClock, read_keyboard
+from profiler import profiler
 from game_data import levels
 
 
 class Level:
     """The Level class represents an individual level in the game. It handles the setup,
         updating, and rendering of various game elements such as terrain, player, enemies, collectibles, and more.
+        Updating and rendering are separate passes, so a level can also be stepped headless with injected controls
+        and no display surface, see headless.py.
 
         Parameters:
                 current_level: The current level number.
-                surface: The Pygame surface object representing the game window.
+                surface: The Pygame surface object representing the game window,
+                    None for a headless level that is only stepped with update.
                 create_overworld: Callback function to create the overworld when transitioning between levels.
                 change_coins: Callback function to change the number of coins collected.
                 change_health: Callback function to change the player's health.
+                layouts (optional): Layouts of the level prepared in advance, for example by the LevelPreloader.
+                    Defaults to None, which loads them with level_loader.load_layouts.
+                seed (optional): Seed of the random number generator used by the level, so a recorded game can be
+                    replayed exactly. Defaults to None, which picks a random seed.
     """
-    def __init__(self, current_level, surface, create_overworld, change_coins, change_health):
+    def __init__(self, current_level, surface, create_overworld, change_coins, change_health, layouts=None,
+                 seed=None):
 
         # general setup
         self.display_surface = surface
-        self.world_shift_x = 0
+        self.camera = Camera(screen_width, screen_height)
+        self.clock = SimulationClock()
+        # every random choice of the level is drawn from this generator
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.random = random.Random(self.seed)
 
         # audio
-        self.coin_sound = pygame.mixer.Sound('../audio/effects/coin.wav')
-        self.coin_sound.set_volume(0.5)
-        self.stomp_sound = pygame.mixer.Sound('../audio/effects/stomp.wav')
-        self.stomp_sound.set_volume(0.7)
+        self.coin_sound = import_sound('../audio/effects/coin.wav', 0.5)
+        self.stomp_sound = import_sound('../audio/effects/stomp.wav', 0.7)
 
         # overworld connection
         self.create_overworld = create_overworld
         self.current_level = current_level
         level_data = levels[self.current_level]
         self.new_max_level = level_data['unlock']
+        if layouts is None:
+            layouts = load_layouts(level_data)
 
         # player setup
-        player_layout = import_csv_layout(level_data['player'])
+        player_layout = layouts['player']
         self.player = pygame.sprite.GroupSingle()
         self.goal = pygame.sprite.GroupSingle()
         self.player_setup(player_layout, change_health)
@@ -54,6 +73,9 @@ class Level:
         # ui
         self.change_coins = change_coins
 
+        # particle effects, spawned from a preloaded pool
+        self.particles = ParticleSystem()
+
         # dust particles
         self.dust_sprite = pygame.sprite.GroupSingle()
         self.player_on_ground = False
@@ -61,75 +83,100 @@ class Level:
         # explosion particles
         self.explosion_sprites = pygame.sprite.Group()
 
+        # tile sheets, cut once and shared by every terrain and grass tile
+        self.terrain_tileset = Tileset('../graphics/terrain/terrain_tiles.png')
+        self.grass_tileset = Tileset('../graphics/decoration/grass/grass.png')
+
         # terrain setup
-        terrain_layout = import_csv_layout(level_data['terrain'])
+        terrain_layout = layouts['terrain']
         self.terrain_sprites = self.create_tile_group(terrain_layout, 'terrain')
+        # the tiles are kept for collisions, but drawn from a few chunks baked at the end of the setup
+        self.terrain_chunks = None
 
         # moving platforms
-        moving_platform_layout = import_csv_layout(level_data['moving platform'])
+        moving_platform_layout = layouts['moving platform']
         self.moving_platform_sprites = self.create_tile_group(moving_platform_layout, 'moving platform')
 
         # grass setup
-        grass_layout = import_csv_layout(level_data['grass'])
+        grass_layout = layouts['grass']
         self.grass_sprites = self.create_tile_group(grass_layout, 'grass')
+        self.grass_chunks = None
 
         # crates setup
-        crate_layout = import_csv_layout(level_data['crates'])
+        crate_layout = layouts['crates']
         self.crate_sprites = self.create_tile_group(crate_layout, 'crates')
 
         # health setup
-        health_layout = import_csv_layout(level_data['health'])
+        health_layout = layouts['health']
         self.health_sprites = self.create_tile_group(health_layout, 'health')
 
         # coins setup
-        coins_layout = import_csv_layout(level_data['coins'])
+        coins_layout = layouts['coins']
         self.coin_sprites = self.create_tile_group(coins_layout, 'coins')
 
         # foreground palms setup
-        fg_palms_layout = import_csv_layout(level_data['fg_palms'])
+        fg_palms_layout = layouts['fg_palms']
         self.fg_palm_sprites = self.create_tile_group(fg_palms_layout, 'fg_palms')
 
         # background palms setup
-        bg_palms_layout = import_csv_layout(level_data['bg_palms'])
+        bg_palms_layout = layouts['bg_palms']
         self.bg_palm_sprites = self.create_tile_group(bg_palms_layout, 'bg_palms')
 
         # spikes setup
-        spikes_layout = import_csv_layout(level_data['spikes'])
+        spikes_layout = layouts['spikes']
         self.spike_sprites = self.create_tile_group(spikes_layout, 'spikes')
 
         # enemy setup
-        enemy_layout = import_csv_layout(level_data['enemies'])
+        enemy_layout = layouts['enemies']
         self.enemy_sprites = self.create_tile_group(enemy_layout, 'enemies')
 
         # shell setup
-        shell_layout = import_csv_layout(level_data['shell'])
+        shell_layout = layouts['shell']
         self.shell_sprites = self.create_tile_group(shell_layout, 'shell')
         self.pearl_sprite = pygame.sprite.Group()
 
         # boss setup
-        boss_layout = import_csv_layout(level_data['boss'])
+        boss_layout = layouts['boss']
         self.boss_sprite = self.create_tile_group(boss_layout, 'boss')
 
         # treasure setup
-        treasure_layout = import_csv_layout(level_data['treasure'])
+        treasure_layout = layouts['treasure']
         self.treasure_sprite = self.create_tile_group(treasure_layout, 'treasure')
 
         # enemy constraint setup
-        constraints_layout = import_csv_layout(level_data['constraints'])
+        constraints_layout = layouts['constraints']
         self.constraint_sprites = self.create_tile_group(constraints_layout, 'constraints')
 
+        # groups whose sprites move during updates, drawn interpolated between updates
+        self.moving_groups = [self.player, self.moving_platform_sprites, self.enemy_sprites, self.pearl_sprite,
+                              self.boss_sprite]
+
+        # groups that sprites are removed from or added to during play
+        self.dynamic_groups = [self.coin_sprites, self.health_sprites, self.enemy_sprites, self.explosion_sprites,
+                               self.dust_sprite, self.pearl_sprite, self.boss_sprite]
+
+        # collision grid over everything the player can stand on or bump into
+        self.collision_grid = SpatialHash()
+        self.collision_grid.add_group(self.terrain_sprites)
+        self.collision_grid.add_group(self.crate_sprites)
+        self.collision_grid.add_group(self.moving_platform_sprites, moving=True)
+        self.collision_grid.add_group(self.shell_sprites, moving=True)
+
         # decoration
         self.sky = Sky(7)
-        level_width = len(terrain_layout[0]) * tile_size
-        self.water = Water(screen_height - 40, level_width)
-        self.clouds = Clouds(400, level_width, 30)
+        self.water = Water(screen_height - 40)
+        self.clouds = Clouds(400, 12, rng=self.random)
+
+        # baking while the level loads keeps it out of the first frame, a headless level bakes on its first draw
+        if surface is not None:
+            self.bake()
 
     def create_tile_group(self, layout, type):
-        """Creates a sprite group for a specific type of tile based on layout data, imported from the corresponding
-            .csv file in the level_data dictionary.
+        """Creates a sprite group for a specific type of tile based on layout data, loaded from the compiled level
+            file or the corresponding .csv file in the level_data dictionary.
 
             Parameters:
-                layout: Layout data parsed from CSV files.
+                layout: Rows of integer tile ids from level_loader.load_layouts.
                 type: Type of tile group to create (e.g., terrain, moving platform, crates).
 
             Returns: Sprite group containing tiles of the specified type.
@@ -138,23 +185,22 @@ class Level:
 
         for row_index, row in enumerate(layout):
             for col_index, val in enumerate(row):
-                if val != '-1':
+                if val != -1:
                     x = col_index * tile_size
                     y = row_index * tile_size
 
                     if type == 'terrain':
-                        terrain_tile_list = import_cut_graphics('../graphics/terrain/terrain_tiles.png')
-                        tile_surface = terrain_tile_list[int(val)]
+                        tile_surface = self.terrain_tileset.get(val)
                         sprite = StaticTile(tile_size, x, y, tile_surface)
 
                     elif type == 'moving platform':
-                        if val == '0':
+                        if val == 0:
                             sprite = MovingPlatform(tile_size, x, y, '../graphics/terrain/moving_platforms/horizontal_platform.png',
                                                     'horizontal')
-                        elif val == '1':
+                        elif val == 1:
                             sprite = MovingPlatform(tile_size, x, y, '../graphics/terrain/moving_platforms/small_island_horiz.png',
                                                     'horizontal')
-                        elif val == '2':
+                        elif val == 2:
                             sprite = MovingPlatform(tile_size, x, y, '../graphics/terrain/moving_platforms/small_island_vert.png',
                                                     'vertical')
                         else:
@@ -162,8 +208,7 @@ class Level:
                                                     'vertical')
 
                     elif type == 'grass':
-                        grass_tile_list = import_cut_graphics('../graphics/decoration/grass/grass.png')
-                        tile_surface = grass_tile_list[int(val)]
+                        tile_surface = self.grass_tileset.get(val)
                         sprite = StaticTile(tile_size, x, y, tile_surface)
 
                     elif type == 'crates':
@@ -173,13 +218,13 @@ class Level:
                         sprite = RumBottle(tile_size, x, y)
 
                     elif type == 'coins':
-                        if val == '0':
+                        if val == 0:
                             sprite = Coin(tile_size, x, y, '../graphics/coins/gold', 5)
                         else:
                             sprite = Coin(tile_size, x, y, '../graphics/coins/silver', 1)
 
                     elif type == 'fg_palms':
-                        if val == '0':
+                        if val == 0:
                             sprite = Palm(tile_size, x, y, '../graphics/terrain/palm_small', 38)
                         else:
                             sprite = Palm(tile_size, x, y, '../graphics/terrain/palm_large', 64)
@@ -194,16 +239,16 @@ class Level:
                         sprite = Treasure(tile_size, x, y)
 
                     elif type == 'enemies':
-                        sprite = Enemy(tile_size, x, y,)
+                        sprite = Enemy(tile_size, x, y, self.random)
 
                     elif type == 'shell':
-                        if val == '0':
-                            sprite = Shell(tile_size, x, y, 'left')
-                        elif val == '1':
-                            sprite = Shell(tile_size, x, y, 'right')
+                        if val == 0:
+                            sprite = Shell(tile_size, x, y, 'left', self.clock)
+                        elif val == 1:
+                            sprite = Shell(tile_size, x, y, 'right', self.clock)
 
                     elif type == 'boss':
-                        sprite = Boss(tile_size * 3, x, y)
+                        sprite = Boss(tile_size * 3, x, y, self.clock)
 
                     elif type == 'constraints':
                         sprite = Tile(tile_size, x, y)
@@ -216,18 +261,18 @@ class Level:
         """ Sets up the player sprite based on layout data.
 
             Parameters:
-                layout: Layout data parsed from CSV files.
+                layout: Rows of integer tile ids from level_loader.load_layouts.
                 change_health: Callback function to change the player's health.
         """
         for row_index, row in enumerate(layout):
             for col_index, val in enumerate(row):
                 x = col_index * tile_size
                 y = row_index * tile_size
-                if val == '0':
-                    sprite = Player((x, y), self.display_surface, self.create_jump_particles, change_health)
+                if val == 0:
+                    sprite = Player((x, y), self.create_jump_particles, change_health, self.clock)
                     self.player.add(sprite)
-                elif val == '1':
-                    hat_surface = pygame.image.load('../graphics/character/hat.png').convert_alpha()
+                elif val == 1:
+                    hat_surface = import_image('../graphics/character/hat.png')
                     sprite = StaticTile(tile_size, x, y, hat_surface)
                     self.goal.add(sprite)
 
@@ -253,8 +298,7 @@ class Level:
             pos -= pygame.math.Vector2(10, 5)
         else:
             pos += pygame.math.Vector2(10, -5)
-        jump_particle_sprite = ParticleEffect(pos, 'jump')
-        self.dust_sprite.add(jump_particle_sprite)
+        self.particles.spawn('jump', pos, self.dust_sprite)
 
     # In order to fix the problem with where the collision happened
     # we must separate the vertical and horizontal movements and collisions
@@ -270,8 +314,8 @@ class Level:
             The method is called during each game update cycle and is responsible for ensuring
             that the player sprite does not move through solid objects horizontally.
             It adjusts the player's collision rectangle (collision_rect) based on its movement direction and speed.
-            It iterates over all collidable_sprites (terrain, crates, moving platforms, shells.)
-            to check for collisions with the player's collision rectangle using the colliderect method.
+            It queries the collision grid for the collidable_sprites (terrain, crates, moving platforms, shells)
+            in the cells around the player and checks them for collisions with the player's collision rectangle using the colliderect method.
 
             If a collision is detected:
                 If the player is moving left (direction.x < 0), it positions the player's collision rectangle
@@ -284,8 +328,7 @@ class Level:
         """
         player = self.player.sprite
         player.collision_rect.x += player.direction.x * player.speed
-        collidable_sprites = (self.terrain_sprites.sprites() + self.crate_sprites.sprites() +
-                              self.moving_platform_sprites.sprites() + self.shell_sprites.sprites())
+        collidable_sprites = self.collision_grid.query(player.collision_rect)
 
         for sprite in collidable_sprites:
             # We use colliderect instead of sprite collision because we want to have access to each of the tile's rect
@@ -305,8 +348,8 @@ class Level:
             The method is called during each game update cycle and prevents the player sprite
             from falling through solid objects (ground) and from passing through ceilings.
             It adjusts the player's collision rectangle (collision_rect) based on its movement direction and speed.
-            It iterates hover all collidable_sprites (terrain, crates, moving platforms, shells)
-            to check for collisions with the player's collision rectangle using the colliderect method.
+            It queries the collision grid for the collidable_sprites (terrain, crates, moving platforms, shells)
+            in the cells around the player and checks them for collisions with the player's collision rectangle using the colliderect method.
 
             If a collision is detected:
                 If the player is moving downward (direction.y > 0), it positions the player's collision rectangle
@@ -326,8 +369,7 @@ class Level:
         """
         player = self.player.sprite
         player.apply_gravity()
-        collidable_sprites = (self.terrain_sprites.sprites() + self.crate_sprites.sprites() +
-                              self.moving_platform_sprites.sprites() + self.shell_sprites.sprites())
+        collidable_sprites = self.collision_grid.query(player.collision_rect)
 
         for sprite in collidable_sprites:
             if sprite.rect.colliderect(player.collision_rect):
@@ -345,30 +387,27 @@ class Level:
                     player.direction.y = 0
                     player.on_ceiling = True
 
-            if player.on_ground and player.direction.y < 0 or player.direction.y > 1:
-                player.on_ground = False
-                player.on_platform = None
+        # checked after the loop, so it also runs when no sprite is close enough to be returned
+        if player.on_ground and player.direction.y < 0 or player.direction.y > 1:
+            player.on_ground = False
+            player.on_platform = None
 
     def scroll_x(self):
-        """Scrolls the game world horizontally based on player movement.
-            When the player reaches a certain portion of the screen, his movement speed is set to 0
-            and teh screen/camera starts shifting in the current direction at the same speed.
+        """Scrolls the camera horizontally based on player movement.
+            When the player reaches a certain portion of the screen, the camera starts moving
+            in the current direction at the same speed as the player, so he stays at the same place on the screen.
+            The sprites themselves keep their world positions.
         """
         player = self.player.sprite
-        player_x = player.rect.centerx
+        player_x = player.rect.centerx - self.camera.offset_x
         direction_x = player.direction.x
         if player_x < screen_width / 2.7 and direction_x < 0:
-            self.world_shift_x = 8
-            player.speed = 0
+            self.camera.scroll(-player.speed)
         elif player_x > screen_width - (screen_width / 2.7) and direction_x > 0:
-            self.world_shift_x = -8
-            player.speed = 0
-        else:
-            self.world_shift_x = 0
-            player.speed = 8
+            self.camera.scroll(player.speed)
 
     def world_shift(self):
-        """Updates the world shift based on player movement."""
+        """Updates the camera position based on player movement."""
         self.scroll_x()
 
     def is_payer_on_ground(self):
@@ -387,8 +426,7 @@ class Level:
                 offset = pygame.math.Vector2(10, 15)
             else:
                 offset = pygame.math.Vector2(-10, 15)
-            fall_dust_particles = ParticleEffect(self.player.sprite.rect.midbottom - offset, 'land')
-            self.dust_sprite.add(fall_dust_particles)
+            self.particles.spawn('land', self.player.sprite.rect.midbottom - offset, self.dust_sprite)
 
     def is_player_alive(self):
         """Checks if the player has fallen of the screen."""
@@ -477,8 +515,7 @@ class Level:
                 if spikes.rect.colliderect(boss.rect):
                     boss.take_damage()
                     if not boss.is_alive():
-                        explosion_sprite = ParticleEffect(boss.rect.center, 'explosion')
-                        self.explosion_sprites.add(explosion_sprite)
+                        self.particles.spawn('explosion', boss.rect.center, self.explosion_sprites)
                         self.stomp_sound.play()
                         boss.kill()
                         self.change_coins(500)
@@ -506,8 +543,7 @@ class Level:
 
                 if enemy_top < player_bottom < enemy_center and self.player.sprite.direction.y >= 0:
                     self.player.sprite.direction.y = -15
-                    explosion_sprite = ParticleEffect(enemy.rect.center, 'explosion')
-                    self.explosion_sprites.add(explosion_sprite)
+                    self.particles.spawn('explosion', enemy.rect.center, self.explosion_sprites)
                     self.stomp_sound.play()
                     enemy.kill()
                 else:
@@ -517,105 +553,224 @@ class Level:
             self.player.sprite.get_damage(-34)
             self.player.sprite.direction.y = -15
 
-    def run(self):
-        """ Runs the entire level, including updating and rendering game elements,
-            handling interactions, and triggering events.
+    def update(self, controls=None):
+        """ Advances the level by one update: moves every sprite, handles the player input and all interactions,
+            and triggers events. Nothing is drawn, so a level can be stepped without a display.
+
+            Parameters:
+                controls (optional): Controls held down during this update, see simulation.Controls.
+                    Defaults to None, which reads them from the keyboard.
         """
+        if controls is None:
+            controls = read_keyboard()
+        profiler.mark('camera')
+        self.clock.tick()
+        self.camera.remember(self.moving_groups)
+
+        # decoration
+        profiler.mark('decoration')
+        self.bg_palm_sprites.update()
+        self.dust_sprite.update()
+
+        # moving platform
+        profiler.mark('platforms')
+        self.moving_platform_sprites.update()
+        self.platform_collision_reverse()
+
+        # enemies
+        profiler.mark('enemies')
+        self.enemy_sprites.update()
+        self.enemy_collision_reverse()
+        self.explosion_sprites.update()
+
+        # shells
+        profiler.mark('shells')
+        self.shell_sprites.update()
+
+        # pearl
+        profiler.mark('pearls')
+        self.pearl_sprite.update(self.camera.visible_rect)
+
+        #boss
+        profiler.mark('boss')
+        self.boss_sprite.update()
+
+        # spikes
+        profiler.mark('spike collisions')
+        self.check_spike_collision()
+
+        # player sprites
+        profiler.mark('collision grid')
+        self.collision_grid.update()
+        profiler.mark('camera')
+        self.world_shift()
+        profiler.mark('player')
+        self.player.update(controls)
+        profiler.mark('horizontal collisions')
+        self.horizontal_movement_collision()
+        self.is_payer_on_ground()
+        profiler.mark('vertical collisions')
+        self.vertical_movement_collision()
+        self.create_landing_dust()
+
+        # animated decoration in front of the player
+        profiler.mark('decoration')
+        self.fg_palm_sprites.update()
+        self.coin_sprites.update()
+
+        profiler.mark('level checks')
+        self.is_player_alive()
+        self.has_player_won()
+
+        profiler.mark('pickups')
+        self.check_bottle_collisions()
+        self.check_coin_collisions()
+        profiler.mark('enemy sight')
+        self.check_boss_sight()
+        self.check_for_shell_sight()
+        profiler.mark('enemy collisions')
+        self.check_pearl_collision()
+        self.check_enemy_collisions()
+
+        # water
+        profiler.mark('decoration')
+        self.water.update()
+
+    def sprite_counts(self):
+        """Returns a dictionary mapping the name of every sprite group of the level to its number of sprites."""
+        return {name: len(group) for name, group in vars(self).items()
+                if isinstance(group, pygame.sprite.AbstractGroup)}
+
+    def snapshot(self):
+        """Captures the complete mutable gameplay state of the level, see restore.
+            The state is a tuple of numbers, tuples and references to the level's own sprites and surfaces,
+            nothing is deep-copied. Purely cosmetic state, like the animation of coins, palms and water, is left out.
+            The player's health and coins belong to the game and are not part of the snapshot.
+
+            Returns: The snapshot, only valid for this level.
+        """
+        dynamic_groups = tuple(tuple(group.sprites()) for group in self.dynamic_groups)
+        sprites = [self.player.sprite, *self.moving_platform_sprites, *self.shell_sprites, *self.enemy_sprites,
+                   *self.pearl_sprite, *self.boss_sprite, *self.explosion_sprites, *self.dust_sprite]
+        sprite_states = tuple((sprite, sprite.snapshot()) for sprite in sprites)
+        return (self.clock.time, self.camera.offset_x, self.player_on_ground, self.random.getstate(),
+                tuple(self.particles.next_index.items()), dynamic_groups, sprite_states)
+
+    def restore(self, snapshot):
+        """Puts the level back into the state captured by snapshot, without rebuilding anything.
+
+            Parameters:
+                snapshot: Snapshot taken from this level.
+        """
+        (self.clock.time, offset_x, self.player_on_ground, random_state, next_index, dynamic_groups,
+         sprite_states) = snapshot
+        self.camera.offset_x = offset_x
+        # nothing to interpolate from, the next frame is drawn at the restored state
+        self.camera.remember([])
+        self.random.setstate(random_state)
+        self.particles.next_index.update(next_index)
+
+        for group, sprites in zip(self.dynamic_groups, dynamic_groups):
+            group.empty()
+            group.add(*sprites)
+            # the visible sprites of static groups are looked up in an index built from their members
+            self.camera.static_index.pop(group, None)
+
+        for sprite, state in sprite_states:
+            sprite.restore(state)
+        self.collision_grid.update()
+
+    def bake(self):
+        """Bakes the terrain and grass tiles into chunk surfaces, done at load time or on the first headless draw."""
+        self.terrain_chunks = bake_chunks(self.terrain_sprites)
+        self.grass_chunks = bake_chunks(self.grass_sprites)
+
+    def draw(self, surface=None, alpha=1):
+        """ Renders the level as it is after the last update, or between the last two updates.
+
+            Parameters:
+                surface (optional): Surface to draw the level on. Defaults to the surface the level was created with.
+                alpha (optional): Progress towards the next update at which the frame is drawn, between 0 and 1.
+                    The camera and the moving sprites are drawn interpolated between their positions before and
+                    after the last update. Defaults to 1, which draws the state after the last update.
+        """
+        surface = surface or self.display_surface
+        profiler.mark('camera')
+        self.camera.interpolate(alpha)
+        if self.terrain_chunks is None:
+            profiler.mark('chunk baking')
+            self.bake()
 
         # sky
-        self.sky.draw(self.display_surface)
-        self.clouds.draw(self.display_surface, self.world_shift_x)
+        profiler.mark('draw sky')
+        self.sky.draw(surface)
+        self.clouds.draw(surface, self.camera)
 
         # bg palms
-        self.bg_palm_sprites.update(self.world_shift_x)
-        self.bg_palm_sprites.draw(self.display_surface)
+        profiler.mark('draw decoration')
+        self.camera.draw(self.bg_palm_sprites, surface, 'bg palms', static=True)
 
         # dust particles
-        self.dust_sprite.update(self.world_shift_x)
-        self.dust_sprite.draw(self.display_surface)
+        profiler.mark('draw particles')
+        self.camera.draw(self.dust_sprite, surface, 'dust')
 
         # terrain
-        self.terrain_sprites.update(self.world_shift_x)
-        self.terrain_sprites.draw(self.display_surface)
-
-        # constraints
-        self.constraint_sprites.update(self.world_shift_x)
+        profiler.mark('draw terrain')
+        self.camera.draw(self.terrain_chunks, surface, 'terrain', static=True)
 
         # moving platform
-        self.moving_platform_sprites.update(self.world_shift_x)
-        self.platform_collision_reverse()
-        self.moving_platform_sprites.draw(self.display_surface)
+        profiler.mark('draw sprites')
+        self.camera.draw(self.moving_platform_sprites, surface, 'moving platforms')
 
         # enemies
-        self.enemy_sprites.update(self.world_shift_x)
-        self.enemy_collision_reverse()
-        self.enemy_sprites.draw(self.display_surface)
-        self.explosion_sprites.update(self.world_shift_x)
-        self.explosion_sprites.draw(self.display_surface)
+        self.camera.draw(self.enemy_sprites, surface, 'enemies')
+        self.camera.draw(self.explosion_sprites, surface, 'explosions')
 
         # shells
-        self.shell_sprites.update(self.world_shift_x)
-        self.shell_sprites.draw(self.display_surface)
+        self.camera.draw(self.shell_sprites, surface, 'shells', static=True)
 
         # pearl
-        self.pearl_sprite.update(self.world_shift_x, surface=self.display_surface)
-        self.pearl_sprite.draw(self.display_surface)
+        self.camera.draw(self.pearl_sprite, surface, 'pearls')
 
         #boss
-        self.boss_sprite.update(self.world_shift_x)
-        self.boss_sprite.draw(self.display_surface)
+        self.camera.draw(self.boss_sprite, surface, 'boss')
 
         # spikes
-        self.spike_sprites.update(self.world_shift_x)
-        self.check_spike_collision()
-        self.spike_sprites.draw(self.display_surface)
+        self.camera.draw(self.spike_sprites, surface, 'spikes', static=True)
 
         # crates
-        self.crate_sprites.update(self.world_shift_x)
-        self.crate_sprites.draw(self.display_surface)
+        self.camera.draw(self.crate_sprites, surface, 'crates', static=True)
 
         # health
-        self.health_sprites.update(self.world_shift_x)
-        self.health_sprites.draw(self.display_surface)
+        self.camera.draw(self.health_sprites, surface, 'health', static=True)
 
         # grass
-        self.grass_sprites.update(self.world_shift_x)
-        self.grass_sprites.draw(self.display_surface)
+        profiler.mark('draw terrain')
+        self.camera.draw(self.grass_chunks, surface, 'grass', static=True)
 
         # player sprites
-        self.world_shift()
-        self.player.update()
-        self.horizontal_movement_collision()
-        self.is_payer_on_ground()
-        self.vertical_movement_collision()
-        self.create_landing_dust()
-        self.player.draw(self.display_surface)
+        profiler.mark('draw player')
+        self.player.sprite.draw_dust(surface, self.camera)
+        self.camera.draw(self.player, surface, 'player')
 
         # fg palms
-        self.fg_palm_sprites.update(self.world_shift_x)
-        self.fg_palm_sprites.draw(self.display_surface)
+        profiler.mark('draw sprites')
+        self.camera.draw(self.fg_palm_sprites, surface, 'fg palms', static=True)
 
         # goal
-        self.goal.update(self.world_shift_x)
-        self.goal.draw(self.display_surface)
+        self.camera.draw(self.goal, surface, 'goal', static=True)
 
         # coins
-        self.coin_sprites.update(self.world_shift_x)
-        self.coin_sprites.draw(self.display_surface)
+        self.camera.draw(self.coin_sprites, surface, 'coins', static=True)
 
         # treasure chest
-        self.treasure_sprite.update(self.world_shift_x)
-        self.treasure_sprite.draw(self.display_surface)
-
-        self.is_player_alive()
-        self.has_player_won()
-
-        self.check_bottle_collisions()
-        self.check_coin_collisions()
-        self.check_boss_sight()
-        self.check_for_shell_sight()
-        self.check_pearl_collision()
-        self.check_enemy_collisions()
+        self.camera.draw(self.treasure_sprite, surface, 'treasure', static=True)
 
         # water
-        self.water.draw(self.display_surface, self.world_shift_x)
+        profiler.mark('draw water')
+        self.water.draw(surface, self.camera)
+
+    def run(self):
+        """ Runs the entire level for one frame: updates it with the keyboard controls and renders it."""
+        self.update()
+        self.draw()
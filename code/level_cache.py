@@ -0,0 +1,56 @@
+"""The level_cache.py module keeps recently played levels, so entering one again does not rebuild it.
+    Building a Level creates every sprite, tile set and chunk of the level. A cached level is kept together with a
+    snapshot of its initial state instead, and entering it again only restores that snapshot, which makes a retry
+    after falling off the screen or dying instantaneous.
+"""
+
+from collections import OrderedDict
+from settings import level_cache_size
+
+
+class LevelCache:
+    """Least recently used cache of built levels and their initial snapshots, keyed by level index.
+
+        Attributes:
+            capacity: Maximum number of levels kept.
+            entries: Ordered dictionary mapping a level index to its (Level, initial snapshot) pair,
+                ordered from least to most recently entered.
+            hits: Number of levels entered from the cache.
+            misses: Number of levels that had to be built.
+    """
+    def __init__(self, capacity=level_cache_size):
+        """Initializes an empty cache.
+
+            Parameters:
+                capacity (optional): Maximum number of levels kept. Defaults to level_cache_size from the settings.
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, current_level, create):
+        """Returns the level in its initial state, building it with create on a miss.
+
+            Parameters:
+                current_level: Index of the level in game_data.levels.
+                create: Function without arguments that builds the Level.
+        """
+        entry = self.entries.get(current_level)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(current_level)
+            level, snapshot = entry
+            level.restore(snapshot)
+            return level
+
+        self.misses += 1
+        level = create()
+        self.entries[current_level] = (level, level.snapshot())
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return level
+
+    def clear(self):
+        """Removes every cached level."""
+        self.entries.clear()
@@ -0,0 +1,220 @@
+"""The level_loader.py module loads the layout layers of a level and compiles them into a binary level file.
+    The Tiled maps (.tmx) in levels/level data are read directly, so the CSV export step is no longer needed;
+    levels without a map fall back to their CSV files. The compiler packs all layers of a level into one
+    file of int16 arrays with a small header, which the loader memory-maps, so opening a level is a single read
+    without any string parsing. A compiled file that is older than its sources or incomplete is ignored and the
+    sources are used instead. The compiler writes a temporary file and replaces the compiled file with it, so a
+    loader that has the old file mapped keeps reading it and an interrupted compile never leaves a partial file.
+
+    Run this module from the code folder to compile every level listed in game_data.levels:
+        python level_loader.py
+"""
+
+import mmap
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ElementTree
+from array import array
+from support import import_csv_layout
+from game_data import levels, level_layers
+
+MAGIC = b'QFBL'
+VERSION = 1
+# the file is written in the byte order of the compiling machine, a loader with a different byte order
+# reads this mark swapped and treats the file as stale
+BYTE_ORDER_MARK = 0xFEFF
+
+# magic, version, byte order mark, number of layers, rows, columns
+HEADER = struct.Struct('=4sHHHHH')
+# layer name, source mtime in nanoseconds, source size in bytes
+LAYER_ENTRY = struct.Struct('=32sqq')
+
+# Tiled layer names that differ from the layer names used in game_data
+TMX_LAYER_NAMES = {'bg palms': 'bg_palms', 'fg palms': 'fg_palms', 'moving_platforms': 'moving platform'}
+# the upper bits of a GID hold the flip and rotation flags of the cell
+TMX_GID_MASK = 0x0FFFFFFF
+
+# map path -> (source stamp, layouts) of every parsed Tiled map
+tmx_cache = {}
+
+
+def read_csv_layers(level_data):
+    """Reads every layout layer of a level from its CSV files.
+
+        Parameters:
+            level_data: Level dictionary from game_data.levels.
+
+        Returns: Dictionary mapping each layer name to its rows of integer tile ids, where -1 marks an empty cell.
+    """
+    layouts = {}
+    for layer in level_layers:
+        layouts[layer] = [[int(val) for val in row] for row in import_csv_layout(level_data[layer])]
+    return layouts
+
+
+def read_tmx_layers(path):
+    """Reads every layout layer of a level from its Tiled map.
+        Each GID is converted to the local tile id of its tileset by subtracting the tileset's firstgid,
+        which gives the same numbers as the CSV export. The result is cached until the map file changes.
+
+        Parameters:
+            path: Path to the .tmx file.
+
+        Returns: Dictionary mapping each layer name to its rows of integer tile ids, where -1 marks an empty cell.
+    """
+    stamp = source_stamp(path)
+    cached = tmx_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    root = ElementTree.parse(path).getroot()
+    # largest firstgid first, so the first one that is not above a GID is the tileset the GID belongs to
+    firstgids = sorted((int(tileset.get('firstgid')) for tileset in root.iter('tileset')), reverse=True)
+
+    layouts = {}
+    for layer in root.iter('layer'):
+        layout = []
+        for line in layer.find('data').text.split():
+            row = []
+            for val in line.rstrip(',').split(','):
+                gid = int(val) & TMX_GID_MASK
+                if gid == 0:
+                    row.append(-1)
+                else:
+                    firstgid = next(firstgid for firstgid in firstgids if firstgid <= gid)
+                    row.append(gid - firstgid)
+            layout.append(row)
+        name = layer.get('name')
+        layouts[TMX_LAYER_NAMES.get(name, name)] = layout
+
+    missing = [layer for layer in level_layers if layer not in layouts]
+    if missing:
+        raise ValueError(f'{path} has no layers named {", ".join(missing)}')
+
+    tmx_cache[path] = (stamp, layouts)
+    return layouts
+
+
+def layer_sources(level_data):
+    """Returns a dictionary mapping each layer name to the file its layout is read from.
+        All layers come from the Tiled map when the level has one, otherwise each layer comes from its CSV file.
+    """
+    tmx_path = level_data.get('tmx')
+    if tmx_path and os.path.exists(tmx_path):
+        return {layer: tmx_path for layer in level_layers}
+    return {layer: level_data[layer] for layer in level_layers}
+
+
+def read_source_layers(level_data):
+    """Reads every layout layer of a level from its Tiled map, or from its CSV files if it has no map."""
+    tmx_path = level_data.get('tmx')
+    if tmx_path and os.path.exists(tmx_path):
+        return read_tmx_layers(tmx_path)
+    return read_csv_layers(level_data)
+
+
+def source_stamp(path):
+    """Returns the (mtime in nanoseconds, size) pair used to detect changes to a source file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def compile_level(level_data):
+    """Packs all layout layers of a level into its compiled level file.
+
+        Parameters:
+            level_data: Level dictionary from game_data.levels.
+
+        Returns: Path of the written file.
+    """
+    layouts = read_source_layers(level_data)
+    sources = layer_sources(level_data)
+    rows = len(layouts[level_layers[0]])
+    cols = len(layouts[level_layers[0]][0])
+
+    for layer in level_layers:
+        layout = layouts[layer]
+        if len(layout) != rows or any(len(row) != cols for row in layout):
+            raise ValueError(f'layer {layer} of {level_data["compiled"]} is not {cols}x{rows} tiles')
+
+    path = level_data['compiled']
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(level_layers), rows, cols))
+            for layer in level_layers:
+                mtime, size = source_stamp(sources[layer])
+                file.write(LAYER_ENTRY.pack(layer.encode(), mtime, size))
+            for layer in level_layers:
+                array('h', [val for row in layouts[layer] for val in row]).tofile(file)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    return path
+
+
+def load_compiled_layers(level_data):
+    """Memory-maps the compiled level file and exposes its layers without copying them.
+
+        Parameters:
+            level_data: Level dictionary from game_data.levels.
+
+        Returns: Dictionary mapping each layer name to a list of rows, where every row is an int16 memoryview,
+            or None if the compiled file is missing, from another format version, older than its sources, or empty
+            or cut short, like the file of an interrupted compile.
+    """
+    path = level_data.get('compiled')
+    if not path or not os.path.exists(path):
+        return None
+
+    header_size = HEADER.size + len(level_layers) * LAYER_ENTRY.size
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < header_size:
+            return None
+        # the map stays valid after the file is closed and is released once the last row view is gone
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, byte_order_mark, layer_count, rows, cols = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or byte_order_mark != BYTE_ORDER_MARK or layer_count != len(level_layers):
+        return None
+
+    sources = layer_sources(level_data)
+    offset = HEADER.size
+    for layer in level_layers:
+        name, mtime, size = LAYER_ENTRY.unpack_from(data, offset)
+        offset += LAYER_ENTRY.size
+        if name.rstrip(b'\0').decode() != layer or source_stamp(sources[layer]) != (mtime, size):
+            return None
+
+    if len(data) - offset != len(level_layers) * rows * cols * array('h').itemsize:
+        return None
+    tiles = memoryview(data)[offset:].cast('h')
+    layouts = {}
+    for index, layer in enumerate(level_layers):
+        start = index * rows * cols
+        layouts[layer] = [tiles[start + row * cols:start + (row + 1) * cols] for row in range(rows)]
+    return layouts
+
+
+def load_layouts(level_data):
+    """Loads every layout layer of a level, preferring an up-to-date compiled level file over the Tiled map or CSVs.
+
+        Parameters:
+            level_data: Level dictionary from game_data.levels.
+
+        Returns: Dictionary mapping each layer name to its rows of integer tile ids, where -1 marks an empty cell.
+            The layouts are shared with the compiled file or the Tiled map cache and must not be modified.
+    """
+    layouts = load_compiled_layers(level_data)
+    if layouts is None:
+        layouts = read_source_layers(level_data)
+    return layouts
+
+
+if __name__ == '__main__':
+    selected = [int(arg) for arg in sys.argv[1:]] or list(levels)
+    for level in selected:
+        print('compiled', compile_level(levels[level]))
@@ -3,13 +3,25 @@
     The code is structured in an object-oriented manner, with a clear separation of concerns.
     Each class (Game, Overworld, Level, UI) handles specific aspects of the game, making the code modular
     and easier to maintain and add new features.
+    The game loop runs the simulation at a fixed rate of simulation_rate updates per second, however fast frames are
+    rendered. Each frame runs as many updates as the time that has passed calls for and then renders the game
+    interpolated between the last two updates, so gameplay speed does not depend on the frame rate.
 """
 
 import pygame, sys
+import time
 from settings import *
 from overworld import Overworld
 from level import Level
 from ui import UI
+from preloader import LevelPreloader
+from level_cache import LevelCache
+from simulation import read_keyboard
+from replay import Recording
+from profiler import profiler
+from frame_trace import tracer
+from hitches import HitchDetector
+from memory_report import memory_report
 
 
 class Game:
@@ -25,6 +37,10 @@ class Game:
             overworld: Instance of the Overworld class representing the game's overworld environment.
             status: Current status of the game (overworld or level).
             ui: User interface instance for displaying health and coins.
+            preloader: Loads the level selected on the overworld in the background.
+            level_cache: Recently played levels, entered again by restoring their initial state.
+            recording: Recording of the game on the current level, None when not recording.
+            hitches: Detects the frames that take longer than the frame budget.
     """
     def __init__(self):
         """ Initializes game attributes and creates necessary instances."""
@@ -41,16 +57,28 @@ class Game:
         self.overworld_bg_music.set_volume(0.5)
 
         # overworld creation
-        self.overworld = Overworld(0, self.max_level, screen, self.create_level)
+        self.recording = None
+        self.preloader = LevelPreloader()
+        self.level_cache = LevelCache()
+        self.hitches = HitchDetector()
+        self.overworld = Overworld(0, self.max_level, screen, self.create_level, self.preloader.request)
         self.status = 'overworld'
         self.overworld_bg_music.play(loops=-1)
 
         # ui
         self.ui = UI(screen)
+        profiler.notes = self.profiler_notes
 
     def create_level(self, current_level):
-        """Creates a new level instance."""
-        self.level = Level(current_level, screen, self.create_overworld, self.change_coins, self.change_health)
+        """Creates a new level instance, or resets the cached one if the level was played recently."""
+        layouts = self.preloader.take(current_level)
+        with profiler.span('create level', level=current_level, cached=current_level in self.level_cache.entries):
+            self.level = self.level_cache.get(current_level, lambda: Level(current_level, screen,
+                                                                           self.create_overworld, self.change_coins,
+                                                                           self.change_health, layouts))
+        self.preloader.release()
+        if record_replays:
+            self.recording = Recording(current_level, self.level.seed, self.current_health, self.coin_amount)
         self.status = 'level'
         self.overworld_bg_music.stop()
         self.level_bg_music.play(loops=-1)
@@ -58,11 +86,12 @@ class Game:
     def create_overworld(self, current_level, new_max_level):
         """ Creates a new overworld instance."""
         if new_max_level == 6:
-            pygame.quit()
-            sys.exit()
+            self.quit()
         if new_max_level > self.max_level:
             self.max_level = new_max_level
-        self.overworld = Overworld(current_level, self.max_level, screen, self.create_level)
+        with profiler.span('create overworld'):
+            self.overworld = Overworld(current_level, self.max_level, screen, self.create_level,
+                                       self.preloader.request)
         self.status = 'overworld'
         self.level_bg_music.stop()
         self.overworld_bg_music.play(loops=-1)
@@ -82,20 +111,74 @@ class Game:
             self.current_health = 100
             self.coin_amount = 0
             self.max_level = 0
-            self.overworld = Overworld(0, self.max_level, screen, self.create_level)
+            with profiler.span('create overworld'):
+                self.overworld = Overworld(0, self.max_level, screen, self.create_level, self.preloader.request)
             self.status = 'overworld'
             self.level_bg_music.stop()
             self.overworld_bg_music.play(loops=-1)
 
+    def save_recording(self):
+        """Writes the recording of the current level to the replay folder, if there is one."""
+        if self.recording:
+            self.recording.save()
+            self.recording = None
+
+    def quit(self):
+        """Saves the recording of the current level and the frame trace being recorded, if any, prints the hitches and
+            closes the game.
+        """
+        self.save_recording()
+        if tracer.enabled:
+            tracer.save()
+        print(self.hitches.report())
+        pygame.quit()
+        sys.exit()
+
+    def profiler_notes(self):
+        """Returns the lines shown below the phases in the profiler overlay, the culling counts of the last frame."""
+        if self.status != 'level':
+            return []
+        return ['culling: ' + self.level.camera.culling_report()]
+
+    def memory_report(self):
+        """Returns the MemoryReport of the asset cache and of the levels kept in the level cache."""
+        return memory_report(level for level, _ in self.level_cache.entries.values())
+
+    def update(self):
+        """Advances the overworld or the current level by one simulation update."""
+        with profiler.span('update'):
+            if self.status == 'overworld':
+                self.overworld.update()
+            else:
+                controls = read_keyboard()
+                self.level.update(controls)
+                profiler.mark('recording')
+                if self.recording:
+                    self.recording.record(controls, self.level, self.current_health, self.coin_amount)
+                self.check_game_over()
+                if self.status != 'level':
+                    self.save_recording()
+
+    def draw(self, alpha=1):
+        """Renders the overworld or the current level and the user interface.
+
+            Parameters:
+                alpha (optional): Progress towards the next update at which the frame is drawn, between 0 and 1.
+                    Defaults to 1, which draws the state after the last update.
+        """
+        with profiler.span('draw'):
+            if self.status == 'overworld':
+                self.overworld.draw(alpha)
+            else:
+                self.level.draw(alpha=alpha)
+                profiler.mark('draw ui')
+                self.ui.show_health(self.current_health, self.max_health)
+                self.ui.show_coins(self.coin_amount)
+
     def run(self):
-        """Main game loop that handles game state updates and rendering."""
-        if self.status == 'overworld':
-            self.overworld.run()
-        else:
-            self.level.run()
-            self.ui.show_health(self.current_health, self.max_health)
-            self.ui.show_coins(self.coin_amount)
-            self.check_game_over()
+        """Runs one update of the game and renders it."""
+        self.update()
+        self.draw()
 
 
 # Pygame setup
@@ -104,14 +187,48 @@ pygame.init()
 screen = pygame.display.set_mode((screen_width, screen_height))
 clock = pygame.time.Clock()
 game = Game()
+if trace_frames:
+    profiler.start_tracing()
+
+# seconds of game time per simulation update
+update_step = 1 / simulation_rate
+# game time that has passed but has not been simulated yet
+accumulator = 0
+previous_time = time.perf_counter()
 
 while True:
+    frame_start = time.perf_counter()
+    profiler.begin_frame()
+    profiler.mark('events')
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-    game.run()
-
+            game.quit()
+        if event.type == pygame.KEYDOWN and event.key == memory_key:
+            print(game.memory_report().text())
+        profiler.handle_event(event)
+
+    current_time = time.perf_counter()
+    accumulator += current_time - previous_time
+    previous_time = current_time
+
+    updates = 0
+    while accumulator >= update_step and updates < max_updates_per_frame:
+        game.update()
+        accumulator -= update_step
+        updates += 1
+
+    # when the machine cannot keep up, drop the time that could not be simulated instead of trying to catch up on it
+    # in later frames, which would only make those frames slower (the spiral of death)
+    if accumulator >= update_step:
+        accumulator %= update_step
+
+    game.draw(accumulator / update_step)
+    profiler.mark('profiler overlay')
+    profiler.draw(screen)
+
+    profiler.mark('display update')
     pygame.display.update()
-    clock.tick(60)
+    # the time spent waiting for the next frame is not part of the frame
+    profiler.end_frame()
+    game.hitches.check((time.perf_counter() - frame_start) * 1000, game)
+    clock.tick(render_fps)
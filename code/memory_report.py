@@ -0,0 +1,184 @@
+"""The memory_report.py module accounts for the memory used by the pixels of every cached and live pygame.Surface.
+    Surfaces loaded through the asset cache are shared by all sprites that use them, but some surfaces belong to a
+    single level: the invisible constraint Tiles, the baked chunks and the sky backdrop are created per level, so their
+    memory grows with the size of the level. The report lists every surface once with its size, pixel format, owner
+    and bytes, and sums the bytes per asset path and per level.
+
+    The game prints the report, together with the hit and miss counters of the asset cache, when the memory_key (F5
+    by default) is pressed, and benchmark.py includes the totals of every level in its results.
+"""
+
+from collections import namedtuple
+import pygame
+from support import asset_cache, surface_memory
+
+# one surface of the report, source is the asset path of a cached surface and None for one created by a level
+SurfaceRecord = namedtuple('SurfaceRecord', ['owner', 'source', 'size', 'format', 'bytes'])
+
+
+def surface_format(surface):
+    """Returns a short description of the pixel format of a surface, like '32 bit alpha'."""
+    description = f'{surface.get_bitsize()} bit'
+    if surface.get_flags() & pygame.SRCALPHA:
+        description += ' alpha'
+    if surface.get_flags() & pygame.RLEACCEL:
+        description += ' rle'
+    return description
+
+
+def surface_bytes(surface):
+    """Returns the number of bytes used by the pixels of a surface, 0 for a subsurface sharing its parent's pixels."""
+    return 0 if surface.get_parent() is not None else surface_memory(surface)
+
+
+def find_surfaces(value, depth=5):
+    """Yields the surfaces referenced by a value: the value itself, the items of a list, tuple or dictionary, or the
+        attributes of an object, following the references up to depth levels deep. Sprite groups and functions are
+        not followed, they belong to other owners.
+    """
+    if isinstance(value, pygame.Surface):
+        yield value
+    elif depth == 0 or callable(value) or isinstance(value, (str, bytes, pygame.sprite.AbstractGroup)):
+        return
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            yield from find_surfaces(item, depth - 1)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from find_surfaces(item, depth - 1)
+    elif hasattr(value, '__dict__'):
+        for item in vars(value).values():
+            yield from find_surfaces(item, depth - 1)
+
+
+def asset_sources():
+    """Returns a dictionary mapping the id of every surface in the asset cache to the asset path it was loaded from."""
+    sources = {}
+    for key, (asset, _) in list(asset_cache.entries.items()):
+        for surface in find_surfaces(asset):
+            sources[id(surface)] = key[1]
+    return sources
+
+
+class MemoryReport:
+    """Collects every surface of the asset cache and of any number of levels, each surface counted once.
+
+        Attributes:
+            records: Dictionary mapping the id of every collected surface to its SurfaceRecord.
+            level_surfaces: Dictionary mapping the index of every collected level to the ids of the surfaces it uses.
+            sources: Dictionary mapping the id of every cached surface to its asset path.
+    """
+    def __init__(self):
+        """Collects the surfaces of the asset cache."""
+        self.records = {}
+        self.level_surfaces = {}
+        self.sources = asset_sources()
+        for key, (asset, _) in list(asset_cache.entries.items()):
+            for surface in find_surfaces(asset):
+                self.add(surface, 'asset cache')
+
+    def add(self, surface, owner):
+        """Records a surface under an owner, unless it was recorded before under another owner than the cache.
+
+            Returns: The id of the surface.
+        """
+        surface_id = id(surface)
+        record = self.records.get(surface_id)
+        if record is None:
+            self.records[surface_id] = SurfaceRecord(owner, self.sources.get(surface_id), surface.get_size(),
+                                                     surface_format(surface), surface_bytes(surface))
+        elif record.owner == 'asset cache':
+            # a cached surface is owned by the first sprite found using it
+            self.records[surface_id] = record._replace(owner=owner)
+        return surface_id
+
+    def add_level(self, level):
+        """Collects the surfaces used by the sprites of every group of a level and by its other attributes.
+            A surface is owned by the group of the first sprite found using it, qualified by the sprite's class, like
+            'terrain_chunks (StaticTile)' or 'constraint_sprites (Tile)', or by the level attribute it was found in,
+            like 'sky' or 'water'.
+        """
+        surface_ids = self.level_surfaces.setdefault(level.current_level, set())
+        # the display surface is shared by everything drawn and is not part of the level
+        attributes = {name: value for name, value in vars(level).items() if value is not level.display_surface}
+        for name, group in attributes.items():
+            if isinstance(group, pygame.sprite.AbstractGroup):
+                for sprite in group:
+                    owner = f'{name} ({type(sprite).__name__})'
+                    for surface in find_surfaces(sprite):
+                        surface_ids.add(self.add(surface, owner))
+        for name, value in attributes.items():
+            if not isinstance(value, pygame.sprite.AbstractGroup):
+                for surface in find_surfaces(value):
+                    surface_ids.add(self.add(surface, name))
+
+    def level_totals(self):
+        """Returns a dictionary mapping every collected level to its memory use.
+            Each entry has the bytes and count of the surfaces the level created itself ('owned_bytes',
+            'owned_surfaces'), the bytes of the cached surfaces it shares with other levels ('shared_bytes') and
+            the owned bytes per owner ('owners').
+        """
+        totals = {}
+        for level, surface_ids in self.level_surfaces.items():
+            owned_bytes = shared_bytes = owned_surfaces = 0
+            owners = {}
+            for surface_id in surface_ids:
+                record = self.records[surface_id]
+                if record.source is None:
+                    owned_bytes += record.bytes
+                    owned_surfaces += 1
+                    owners[record.owner] = owners.get(record.owner, 0) + record.bytes
+                else:
+                    shared_bytes += record.bytes
+            totals[level] = {'owned_bytes': owned_bytes, 'owned_surfaces': owned_surfaces,
+                             'shared_bytes': shared_bytes, 'owners': owners}
+        return totals
+
+    def asset_totals(self):
+        """Returns a dictionary mapping every asset path in the cache to the bytes and count of its surfaces and the
+            sorted list of their owners.
+        """
+        totals = {}
+        for record in self.records.values():
+            if record.source is not None:
+                bytes_used, count, owners = totals.get(record.source, (0, 0, set()))
+                owners.add(record.owner)
+                totals[record.source] = (bytes_used + record.bytes, count + 1, owners)
+        return {path: (bytes_used, count, sorted(owners)) for path, (bytes_used, count, owners) in totals.items()}
+
+    def total_bytes(self):
+        """Returns the bytes used by all collected surfaces."""
+        return sum(record.bytes for record in self.records.values())
+
+    def text(self, assets=10):
+        """Returns a human readable summary, listing the counters of the asset cache, the largest assets and every
+            level's owners by size.
+
+            Parameters:
+                assets (optional): Number of the largest assets listed. Defaults to 10.
+        """
+        lines = [f'surface memory: {len(self.records)} surfaces, {self.total_bytes() / 1024:.0f} KiB',
+                 '  ' + asset_cache.report()]
+        asset_totals = sorted(self.asset_totals().items(), key=lambda item: item[1][0], reverse=True)
+        lines.append(f'  cached surfaces: {sum(total[0] for _, total in asset_totals) / 1024:.0f} KiB '
+                     f'in {len(asset_totals)} assets, the largest:')
+        for path, (bytes_used, count, owners) in asset_totals[:assets]:
+            lines.append(f'    {bytes_used / 1024:8.0f} KiB  {count:4} surfaces  {path} ({", ".join(owners)})')
+        for level, totals in sorted(self.level_totals().items()):
+            lines.append(f'  level {level}: {totals["owned_bytes"] / 1024:.0f} KiB in {totals["owned_surfaces"]} '
+                         f'surfaces of its own, {totals["shared_bytes"] / 1024:.0f} KiB shared with the asset cache')
+            for owner, bytes_used in sorted(totals['owners'].items(), key=lambda item: item[1], reverse=True):
+                lines.append(f'    {bytes_used / 1024:8.0f} KiB  {owner}')
+        return '\n'.join(lines)
+
+
+def memory_report(levels=()):
+    """Returns a MemoryReport of the asset cache and the given levels.
+
+        Parameters:
+            levels (optional): Iterable of Levels to include. Defaults to none.
+    """
+    report = MemoryReport()
+    for level in levels:
+        report.add_level(level)
+    return report
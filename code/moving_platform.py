@@ -2,8 +2,8 @@
     Moving platforms can move horizontally or vertically based on their type.
 """
 
-import pygame
 from tiles import StaticTile
+from support import import_image
 
 
 class MovingPlatform(StaticTile):
@@ -25,7 +25,7 @@ class MovingPlatform(StaticTile):
                 path: Path to the image representing the platform.
                 move_type: Type of movement ('horizontal' or 'vertical').
         """
-        super().__init__(size, x, y, pygame.image.load(path).convert_alpha())
+        super().__init__(size, x, y, import_image(path))
         if path == '../graphics/terrain/moving_platforms/horizontal_platform.png':
             offset_x = x + 2 * size
             self.rect = self.image.get_rect(topleft=(offset_x, y))
@@ -47,14 +47,17 @@ class MovingPlatform(StaticTile):
         """Reverses the direction of the platform's movement."""
         self.speed *= -1
 
-    def update(self, x_shift, surface=None):
-        """Updates the position of the platform based on the horizontal shift and moves it according to its type.
+    def snapshot(self):
+        """Returns the position and speed of the platform as a tuple, see restore."""
+        return tuple(self.rect), self.speed
 
-            Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the platform.
-        """
-        self.rect.x += x_shift
+    def restore(self, state):
+        """Puts the platform back into a state returned by snapshot."""
+        rect, self.speed = state
+        self.rect.update(rect)
+
+    def update(self):
+        """Moves the platform according to its type."""
         if self.move_type == 'horizontal':
             self.move_horizontal()
         else:
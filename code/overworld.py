@@ -6,8 +6,10 @@
 
 import pygame
 from game_data import levels
-from support import import_folder
+from support import import_folder, import_image
 from decoration import Sky
+from simulation import SimulationClock
+from profiler import profiler
 
 
 class Node(pygame.sprite.Sprite):
@@ -33,11 +35,13 @@ class Node(pygame.sprite.Sprite):
         super().__init__()
         self.frames = import_folder(path)
         self.frame_index = 0
-        self.image = self.frames[self.frame_index]
         if status == 'available':
             self.status = 'available'
         else:
             self.status = 'locked'
+            # the frames are shared through the asset cache, so the tint must be applied to a private copy
+            self.frames = [frame.copy() for frame in self.frames]
+        self.image = self.frames[self.frame_index]
 
         self.rect = self.image.get_rect(center = pos)
 
@@ -78,7 +82,7 @@ class Icon(pygame.sprite.Sprite):
         """
         super().__init__()
         self.pos = pos
-        self.image = pygame.image.load('../graphics/overworld/hat.png').convert_alpha()
+        self.image = import_image('../graphics/overworld/hat.png')
         self.rect = self.image.get_rect(center=pos)
 
     def update(self):
@@ -100,12 +104,15 @@ class Overworld:
                     nodes: Group containing all nodes on the overworld map.
                     icon: Group containing the player's icon.
                     sky: Instance of the Sky class representing the sky background.
+                    clock: SimulationClock timing the overworld updates.
                     start_time: Time when the level transition started.
+                    previous_icon_pos: Position of the icon before the last update, drawn interpolated from.
                     allow_input: Boolean indicating if player input is allowed.
                     timer_length: Length of the transition timer.
+                    preload_level: Callback function to start loading a level in the background.
             """
 
-    def __init__(self, start_level, max_level, surface, create_level):
+    def __init__(self, start_level, max_level, surface, create_level, preload_level=None):
         """Initializes the overworld with starting level, max level, surface, and level creation callback.
 
             Parameters:
@@ -113,6 +120,7 @@ class Overworld:
                 max_level: The maximum level reached.
                 surface: The display surface.
                 create_level: A function to create a level.
+                preload_level (optional): A function to start loading a level in the background. Defaults to None.
         """
 
         # setup
@@ -120,6 +128,7 @@ class Overworld:
         self.max_level = max_level
         self.current_level = start_level
         self.create_level = create_level
+        self.preload_level = preload_level
 
         # movement logic
         self.moving = False
@@ -132,10 +141,14 @@ class Overworld:
         self.sky = Sky(8, 'overworld')
 
         # time
-        self.start_time = pygame.time.get_ticks()
+        self.clock = SimulationClock()
+        self.start_time = self.clock.get_ticks()
+        self.previous_icon_pos = pygame.math.Vector2(self.icon.sprite.pos)
         self.allow_input = False
         self.timer_length = 300
 
+        self.preload()
+
     def setup_nodes(self):
         """Sets up the nodes on the overworld map."""
         self.nodes = pygame.sprite.Group()
@@ -148,6 +161,11 @@ class Overworld:
 
             self.nodes.add(node_sprite)
 
+    def preload(self):
+        """Starts loading the level of the selected node in the background, so entering it is near-instant."""
+        if self.preload_level:
+            self.preload_level(self.current_level)
+
     def setup_icon(self):
         """Sets up the player's icon on the overworld map."""
         self.icon = pygame.sprite.GroupSingle()
@@ -169,10 +187,12 @@ class Overworld:
                 self.move_direction = self.get_movement_data(1)
                 self.current_level += 1
                 self.moving = True
+                self.preload()
             elif keys[pygame.K_LEFT] and self.current_level > 0:
                 self.move_direction = self.get_movement_data(-1)
                 self.current_level -= 1
                 self.moving = True
+                self.preload()
             elif keys[pygame.K_SPACE]:
                 self.create_level(self.current_level)
 
@@ -218,19 +238,39 @@ class Overworld:
             but keeps holding one of the arrow keys.
         """
         if not self.allow_input:
-            current_time = pygame.time.get_ticks()
+            current_time = self.clock.get_ticks()
             if current_time - self.start_time >= self.timer_length:
                 self.allow_input = True
 
-    def run(self):
-        """Main loop for running the overworld, handling input, updating positions, and rendering."""
+    def update(self):
+        """Advances the overworld by one update, handling input and updating positions."""
+        profiler.mark('overworld')
+        self.clock.tick()
         self.input_timer()
         self.input()
+        self.previous_icon_pos = pygame.math.Vector2(self.icon.sprite.pos)
         self.update_icon_pos()
         self.icon.update()
         self.nodes.update()
 
+    def draw(self, alpha=1):
+        """Renders the overworld.
+
+            Parameters:
+                alpha (optional): Progress towards the next update at which the frame is drawn, between 0 and 1.
+                    The icon is drawn interpolated between its positions before and after the last update.
+                    Defaults to 1, which draws the state after the last update.
+        """
+        profiler.mark('draw overworld')
         self.sky.draw(self.display_surface)
         self.draw_paths()
         self.nodes.draw(self.display_surface)
-        self.icon.draw(self.display_surface)
+
+        icon = self.icon.sprite
+        pos = self.previous_icon_pos.lerp(icon.pos, alpha)
+        self.display_surface.blit(icon.image, icon.image.get_rect(center=pos))
+
+    def run(self):
+        """Main loop for running the overworld, handling input, updating positions, and rendering."""
+        self.update()
+        self.draw()
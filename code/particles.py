@@ -1,11 +1,19 @@
-"""This module defines a class representing various particle effects used in the game."""
+"""This module defines the particle effects used in the game and the pool they are spawned from."""
 
 import pygame
 from support import import_folder
 
+# folders holding the animation frames of each particle effect type
+PARTICLE_PATHS = {
+    'jump': '../graphics/character/dust_particles/jump',
+    'land': '../graphics/character/dust_particles/land',
+    'explosion': '../graphics/enemy/explosion',
+}
+
 
 class ParticleEffect(pygame.sprite.Sprite):
     """Represents a particle effect with animation and movement.
+        Particle effects are created once by the ParticleSystem and restarted with start whenever one is spawned.
 
         Attributes:
             frame_index: Index of the current frame in the animation.
@@ -14,25 +22,29 @@ class ParticleEffect(pygame.sprite.Sprite):
             image: Current frame image of the particle effect.
             rect: Rectangle representing the position and size of the particle effect.
     """
-    def __init__(self, pos, type):
-        """Initializes a ParticleEffect object with a specified position and type.
+    def __init__(self, type):
+        """Initializes a ParticleEffect object of a specified type, ready to be started.
 
             Parameters:
-                pos: Position of the particle effect.
                 type: Type of the particle effect ('jump', 'land', 'explosion').
         """
         super().__init__()
         self.frame_index = 0
         self.animation_speed = 0.5
+        self.frames = import_folder(PARTICLE_PATHS[type])
+        self.image = self.frames[self.frame_index]
+        self.rect = self.image.get_rect()
+
+    def start(self, pos):
+        """Restarts the animation of the particle effect at a position.
 
-        if type == 'jump':
-            self.frames = import_folder('../graphics/character/dust_particles/jump')
-        if type == 'land':
-            self.frames = import_folder('../graphics/character/dust_particles/land')
-        if type == 'explosion':
-            self.frames = import_folder('../graphics/enemy/explosion')
+            Parameters:
+                pos: Position of the center of the particle effect.
+        """
+        self.frame_index = 0
         self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_rect(center=pos)
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
 
     def animate(self):
         """Advances the animation frame and updates the particle effect image."""
@@ -42,11 +54,63 @@ class ParticleEffect(pygame.sprite.Sprite):
         else:
             self.image = self.frames[int(self.frame_index)]
 
-    def update(self, x_shift):
-        """ Updates the particle effect's position and animation.
+    def snapshot(self):
+        """Returns the animation state and position of the particle effect as a tuple, see restore."""
+        return self.frame_index, self.image, tuple(self.rect)
+
+    def restore(self, state):
+        """Puts the particle effect back into a state returned by snapshot."""
+        self.frame_index, self.image, rect = state
+        self.rect.update(rect)
+
+    def update(self):
+        """ Updates the particle effect's animation."""
+        self.animate()
+
+
+class ParticleSystem:
+    """Fixed pool of particle effects for every effect type.
+        All effects are created up front, so spawning one during gameplay only restarts an idle effect and never loads
+        frames or allocates sprites. When every effect of a type is busy, the one spawned longest ago is reused.
+
+        Attributes:
+            pools: Dictionary mapping each effect type to its list of particle effects.
+            next_index: Dictionary mapping each effect type to the pool position checked first by the next spawn.
+    """
+    def __init__(self, pool_size=8):
+        """Initializes the pools of all particle effect types.
 
             Parameters:
-                x_shift: Horizontal shift amount.
+                pool_size (optional): Number of particle effects per type. Defaults to 8.
         """
-        self.animate()
-        self.rect.x += x_shift
+        self.pools = {type: [ParticleEffect(type) for _ in range(pool_size)] for type in PARTICLE_PATHS}
+        self.next_index = {type: 0 for type in PARTICLE_PATHS}
+
+    def spawn(self, type, pos, group):
+        """Starts a particle effect and adds it to a sprite group.
+
+            Parameters:
+                type: Type of the particle effect ('jump', 'land', 'explosion').
+                pos: Position of the center of the particle effect.
+                group: Sprite group the particle effect is updated and drawn with.
+
+            Returns: The started particle effect.
+        """
+        pool = self.pools[type]
+        index = self.next_index[type]
+        # prefer an idle effect, the round robin order makes the fallback the one spawned longest ago
+        for offset in range(len(pool)):
+            if not pool[(index + offset) % len(pool)].alive():
+                index = (index + offset) % len(pool)
+                break
+
+        particle = pool[index]
+        particle.kill()
+        particle.start(pos)
+        group.add(particle)
+        self.next_index[type] = (index + 1) % len(pool)
+        return particle
+
+    def alive_count(self):
+        """Returns the number of particle effects that are currently playing."""
+        return sum(particle.alive() for pool in self.pools.values() for particle in pool)
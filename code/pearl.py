@@ -2,6 +2,7 @@
 
 import pygame
 from tiles import StaticTile
+from support import import_image
 
 
 class Pearl(StaticTile):
@@ -22,20 +23,20 @@ class Pearl(StaticTile):
                 y: Y-coordinate of the pearl.
                 direction: Direction of the pearl (left or right).
         """
-        super().__init__(size, x, y, pygame.image.load('../graphics/enemy/pearl/pearl.png').convert_alpha())
+        super().__init__(size, x, y, import_image('../graphics/enemy/pearl/pearl.png'))
         self.rect = self.image.get_rect(topleft=(x, y))
         self.pearl_sprite = pygame.sprite.GroupSingle()
         self.direction = direction
         self.speed = 7
         self.has_hit = False
 
-    def is_pearl_offcamera(self, surface):
+    def is_pearl_offcamera(self, visible_rect):
         """Checks if the pearl has moved off the camera view.
 
             Parameters:
-                surface: Surface representing the game screen.
+                visible_rect: Rectangle in world coordinates covering the area shown on the screen.
         """
-        if not self.rect.colliderect(surface.get_rect()):
+        if not self.rect.colliderect(visible_rect):
             self.has_hit = True
 
     def destroy(self):
@@ -43,19 +44,26 @@ class Pearl(StaticTile):
         if self.has_hit:
             self.kill()
 
-    def update(self, x_shift, surface=None):
+    def snapshot(self):
+        """Returns the position of the pearl and whether it has hit something as a tuple, see restore."""
+        return tuple(self.rect), self.has_hit
+
+    def restore(self, state):
+        """Puts the pearl back into a state returned by snapshot."""
+        rect, self.has_hit = state
+        self.rect.update(rect)
+
+    def update(self, visible_rect):
         """Updates the position of the pearl and checks for collisions.
 
             Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the pearl on. Defaults to None.
-                This parameter is used when updating the pearl.
+                visible_rect: Rectangle in world coordinates covering the area shown on the screen,
+                used to destroy the pearl once it leaves the camera view.
         """
-        self.rect.x += x_shift
         if self.direction == 'left':
             self.rect.x -= self.speed
         else:
             self.rect.x += self.speed
 
-        self.is_pearl_offcamera(surface)
+        self.is_pearl_offcamera(visible_rect)
         self.destroy()
@@ -3,23 +3,25 @@
 """
 
 import pygame
-from support import import_folder
-from math import sin
+from support import AnimationBank, import_sound
+from effects import Blink
 
 
 class Player(pygame.sprite.Sprite):
     """Represents the player character in the game.
 
         Attributes:
-            animations: Dictionary containing animation frames for different player states (idle, run, jump, fall).
+            animations: AnimationBank with the frames for the different player states (idle, run, jump, fall),
+                facing right and mirrored to face left.
             frame_index: Index of the current animation frame.
             animation_speed: Speed of animation playback.
             image: Current image representing the player.
             rect: Rectangle representing the position and size of the player.
-            dust_run_particles: List of dust particles for running animation.
+            dust_run_particles: AnimationBank with the dust particle frames of the running animation.
             dust_frame_index: Index of the current dust particle frame.
             dust_animation_speed: Speed of dust particle animation playback.
-            display_surface: Surface where the player is rendered.
+            dust_image: Current dust particle frame while running on the ground, None otherwise.
+            dust_pos: World position of the current dust particle frame.
             create_jump_particles: Callback function to create jump particles.
             direction: Vector representing the player's movement direction.
             speed: Speed of player movement.
@@ -35,34 +37,35 @@ class Player(pygame.sprite.Sprite):
             on_right: Boolean indicating whether the player is touching a wall on the right.
             alive: Boolean indicating whether the player is alive.
             change_health: Callback function to change the player's health.
-            invincible: Boolean indicating whether the player is invincible.
             invincibility_duration: Duration of invincibility after taking damage.
-            hurt_time: Time when the player was last hurt.
+            blink: Blink effect that times the invincibility and makes the player flash while it lasts.
             jump_sound: Sound effect for player jumps.
             hit_sound: Sound effect for player taking damage.
+            clock: SimulationClock of the level.
 """
-    def __init__(self, pos, surface, create_jump_particles, change_health):
-        """Initializes the player with starting position, surface, callback functions
+    def __init__(self, pos, create_jump_particles, change_health, clock):
+        """Initializes the player with starting position and callback functions
             for creating jump particles and changing health.
 
             Parameters:
-                pos: Tuple representing the initial position of the player.
-                surface: Pygame surface where the player is rendered.
+                pos: Tuple representing the initial position of the player in world coordinates.
                 create_jump_particles: Callback function to create jump particles.
                 change_health: Callback function to change the player's health.
+                clock: SimulationClock of the level, times the invincibility.
         """
         super().__init__()
         self.import_character_assets()
         self.frame_index = 0
         self.animation_speed = 0.15
-        self.image = self.animations['idle'][self.frame_index]
+        self.image = self.animations.get('idle')[self.frame_index]
         self.rect = self.image.get_rect(topleft=pos)
 
         # dust particles
         self.import_dust_run_particles()
         self.dust_frame_index = 0
         self.dust_animation_speed = 0.15
-        self.display_surface = surface
+        self.dust_image = None
+        self.dust_pos = None
         self.create_jump_particles = create_jump_particles
 
         # in pygame, a vector2 is a list that contains an x and a y value,
@@ -90,32 +93,27 @@ class Player(pygame.sprite.Sprite):
 
         # health management
         self.change_health = change_health
-        self.invincible = False
+        self.clock = clock
         self.invincibility_duration = 500
-        self.hurt_time = 0
+        self.blink = Blink(self.invincibility_duration)
 
         # audio
-        self.jump_sound = pygame.mixer.Sound('../audio/effects/jump.wav')
-        self.jump_sound.set_volume(0.5)
-        self.hit_sound = pygame.mixer.Sound('../audio/effects/hit.wav')
-        self.hit_sound.set_volume(0.7)
+        self.jump_sound = import_sound('../audio/effects/jump.wav', 0.5)
+        self.hit_sound = import_sound('../audio/effects/hit.wav', 0.7)
 
     def import_character_assets(self):
         """Imports player character animations."""
         character_path = '../graphics/character/'
-        self.animations = {'idle': [], 'run': [], 'jump': [], 'fall': []}
-
-        for animation in self.animations.keys():
-            full_path = character_path + animation
-            self.animations[animation] = import_folder(full_path)
+        animations = ['idle', 'run', 'jump', 'fall']
+        self.animations = AnimationBank({animation: character_path + animation for animation in animations})
 
     def import_dust_run_particles(self):
         """Imports dust particles for running animation."""
-        self.dust_run_particles = import_folder('../graphics/character/dust_particles/run')
+        self.dust_run_particles = AnimationBank({'run': '../graphics/character/dust_particles/run'})
 
     def animate(self):
         """Animates the player based on current status and direction."""
-        animation = self.animations[self.status]
+        animation = self.animations.get(self.status, flipped=not self.facing_right)
 
         # loop over the frame index
         self.frame_index += self.animation_speed
@@ -123,39 +121,41 @@ class Player(pygame.sprite.Sprite):
         if self.frame_index >= len(animation):
             self.frame_index = 0
 
-        image = animation[int(self.frame_index)]
+        self.image = self.blink.apply(animation[int(self.frame_index)])
         if self.facing_right:
-            self.image = image
             self.rect.bottomleft = self.collision_rect.bottomleft
         else:
-            flipped_image = pygame.transform.flip(image, True, False)
-            self.image = flipped_image
             self.rect.bottomright = self.collision_rect.bottomright
 
-        if self.invincible:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-
         self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
 
     def run_dust_animation(self):
         """Plays dust particle animation when running."""
         if self.status == 'run' and self.on_ground:
+            dust_frames = self.dust_run_particles.get('run', flipped=not self.facing_right)
             self.dust_frame_index += self.dust_animation_speed
-            if self.dust_frame_index >= len(self.dust_run_particles):
+            if self.dust_frame_index >= len(dust_frames):
                 self.dust_frame_index = 0
 
-            dust_particles = self.dust_run_particles[int(self.dust_frame_index)]
+            self.dust_image = dust_frames[int(self.dust_frame_index)]
 
             if self.facing_right:
-                pos = self.rect.bottomleft - pygame.math.Vector2(6, 10)
-                self.display_surface.blit(dust_particles, pos)
+                self.dust_pos = self.rect.bottomleft - pygame.math.Vector2(6, 10)
             else:
-                pos = self.rect.bottomright - pygame.math.Vector2(6, 10)
-                flipped_dust_particles = pygame.transform.flip(dust_particles, True, False)
-                self.display_surface.blit(flipped_dust_particles, pos)
+                self.dust_pos = self.rect.bottomright - pygame.math.Vector2(6, 10)
+        else:
+            self.dust_image = None
+
+    def draw_dust(self, surface, camera):
+        """Draws the current dust particle frame of the running animation.
+
+            Parameters:
+                surface: Surface to draw the dust on.
+                camera: Camera the player is seen through.
+        """
+        if self.dust_image:
+            lag_x, lag_y = camera.lag(self)
+            surface.blit(self.dust_image, (self.dust_pos.x + lag_x - camera.draw_offset_x, self.dust_pos.y + lag_y))
 
     # To get status of player we can use
     # jump - direction.y < 0
@@ -175,18 +175,20 @@ class Player(pygame.sprite.Sprite):
             else:
                 self.status = 'idle'
 
-    def get_input(self):
-        """Handles player input for movement and jumping."""
-        keys = pygame.key.get_pressed()
+    def get_input(self, controls):
+        """Handles player input for movement and jumping.
 
-        if keys[pygame.K_d]:
+            Parameters:
+                controls: Controls held down during this update, see simulation.Controls.
+        """
+        if controls.right:
             self.move_right()
-        elif keys[pygame.K_a]:
+        elif controls.left:
             self.move_left()
         else:
             self.direction.x = 0
 
-        if keys[pygame.K_SPACE]:
+        if controls.jump:
             self.jump()
 
     def apply_gravity(self):
@@ -221,42 +223,54 @@ class Player(pygame.sprite.Sprite):
             Parameters:
                 damage: Integer representing the amount of damage to apply.
         """
-        if not self.invincible:
+        if not self.blink.active:
             self.hit_sound.play()
             self.change_health(damage)
-            self.invincible = True
-            self.hurt_time = pygame.time.get_ticks()
+            self.blink.start(self.clock.get_ticks())
 
     def invincibility_timer(self):
-        """Manages the duration of invincibility after taking damage."""
-        if self.invincible:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.hurt_time >= self.invincibility_duration:
-                self.invincible = False
+        """Manages the duration of invincibility after taking damage and the flashing shown while it lasts."""
+        self.blink.update(self.clock.get_ticks())
 
     def wave_value(self):
-        """Generates a wave value for creating a flashing effect during invincibility.
+        """Returns the alpha value of the flashing effect during invincibility, worked out by invincibility_timer.
 
             Returns:
                 Integer representing the alpha value.
         """
-        value = sin(pygame.time.get_ticks())
-        if value >= 0:
-            return 255
-        else:
-            return 0
+        return self.blink.alpha
 
-    def update(self):
+    def snapshot(self):
+        """Returns the position, movement, status, animation and invincibility of the player as a tuple.
+            Surfaces and other sprites are only referenced, never copied. See restore.
+        """
+        return (tuple(self.rect), tuple(self.collision_rect), tuple(self.direction), self.status, self.facing_right,
+                self.on_ground, self.on_platform, self.on_ceiling, self.on_left, self.on_right, self.frame_index,
+                self.image, self.dust_frame_index, self.dust_image, self.dust_pos, self.blink.snapshot())
+
+    def restore(self, state):
+        """Puts the player back into a state returned by snapshot."""
+        (rect, collision_rect, direction, self.status, self.facing_right, self.on_ground, self.on_platform,
+         self.on_ceiling, self.on_left, self.on_right, self.frame_index, self.image, self.dust_frame_index,
+         self.dust_image, self.dust_pos, blink_state) = state
+        self.rect = pygame.Rect(rect)
+        self.collision_rect.update(collision_rect)
+        self.direction.update(direction)
+        self.blink.restore(blink_state)
+
+    def update(self, controls):
         """Updates the player's state, including animation, input handling, collision, and health management.
             Also checks for the on_platform attribute if it has a value(reference to a specific moving platform)
             the player will move according to the direction and speed of that moving platform.
+
+            Parameters:
+                controls: Controls held down during this update, see simulation.Controls.
         """
-        self.get_input()
+        self.get_input(controls)
         self.get_status()
+        self.invincibility_timer()
         self.animate()
         self.run_dust_animation()
-        self.invincibility_timer()
-        self.wave_value()
 
         if self.on_platform:
             if self.on_platform.move_type == 'horizontal':
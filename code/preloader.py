@@ -0,0 +1,167 @@
+"""The preloader.py module loads the level selected on the overworld in the background.
+    While the overworld is shown, a worker thread parses the layouts of the selected level and decodes the images it
+    uses, so that building the Level only has to convert the already decoded surfaces on the main thread.
+"""
+
+import threading
+from os import walk
+from os.path import isdir
+import pygame
+from support import asset_cache
+from level_loader import load_layouts
+from game_data import levels
+from frame_trace import tracer
+
+# images and folders every level uses
+COMMON_ASSETS = ['../graphics/decoration/sky/sky_top.png', '../graphics/decoration/sky/sky_bottom.png',
+                 '../graphics/decoration/sky/sky_middle.png', '../graphics/decoration/water',
+                 '../graphics/decoration/clouds', '../graphics/character/idle', '../graphics/character/run',
+                 '../graphics/character/jump', '../graphics/character/fall', '../graphics/character/hat.png',
+                 '../graphics/character/dust_particles/run', '../graphics/character/dust_particles/jump',
+                 '../graphics/character/dust_particles/land', '../graphics/enemy/explosion']
+
+# images and folders used by the sprites of each layout layer, only needed when the layer is not empty
+LAYER_ASSETS = {
+    'terrain': ['../graphics/terrain/terrain_tiles.png'],
+    'grass': ['../graphics/decoration/grass/grass.png'],
+    'coins': ['../graphics/coins/gold', '../graphics/coins/silver'],
+    'fg_palms': ['../graphics/terrain/palm_small', '../graphics/terrain/palm_large'],
+    'bg_palms': ['../graphics/terrain/palm_bg'],
+    'crates': ['../graphics/terrain/crate.png'],
+    'health': ['../graphics/terrain/rum_bottle.png'],
+    'spikes': ['../graphics/enemy/spikes/spikes.png'],
+    'treasure': ['../graphics/character/chest.png'],
+    'enemies': ['../graphics/enemy/run'],
+    'shell': ['../graphics/enemy/shell_left/idle', '../graphics/enemy/shell_left/attack',
+              '../graphics/enemy/shell_right/idle', '../graphics/enemy/shell_right/attack',
+              '../graphics/enemy/pearl/pearl.png'],
+    'boss': ['../graphics/enemy/boss idle', '../graphics/enemy/boss run left', '../graphics/enemy/boss run right'],
+    'moving platform': ['../graphics/terrain/moving_platforms/horizontal_platform.png',
+                        '../graphics/terrain/moving_platforms/small_island_horiz.png',
+                        '../graphics/terrain/moving_platforms/small_island_vert.png',
+                        '../graphics/terrain/moving_platforms/vertical_platform.png'],
+}
+
+
+def level_asset_paths(layouts):
+    """Returns the paths of the images and image folders a level with the given layouts will load."""
+    paths = list(COMMON_ASSETS)
+    for layer, layer_paths in LAYER_ASSETS.items():
+        if any(val != -1 for row in layouts[layer] for val in row):
+            paths.extend(layer_paths)
+    return paths
+
+
+def image_files(path):
+    """Returns the image files behind an asset path, walking the folder the same way support.import_folder does."""
+    if not isdir(path):
+        return [path]
+    return [path + '/' + image for _, __, image_files in walk(path) for image in image_files]
+
+
+class LevelPreloader:
+    """Prepares one level at a time on a worker thread.
+        Requesting another level re-targets the preloader: the running worker notices that its generation is outdated
+        and stops before its next file, the images it staged are dropped, and a new worker starts on the new level.
+        A worker only stages an image while its generation is current, checked under the lock that re-targeting
+        takes, so no image staged for an outdated level is left behind in the asset cache.
+
+        Attributes:
+            target: Index of the level currently being prepared, None when idle.
+            generation: Counter that is increased whenever the target changes, used to cancel outdated workers.
+            ready: Parsed layouts of the prepared levels, keyed by level index.
+    """
+    def __init__(self):
+        """Initializes an idle preloader."""
+        self.target = None
+        self.generation = 0
+        self.ready = {}
+        self.lock = threading.Lock()
+
+    def request(self, level):
+        """Starts preparing a level in the background, cancelling the work on any previously requested level.
+
+            Parameters:
+                level: Index of the level in game_data.levels.
+        """
+        with self.lock:
+            if level == self.target:
+                return
+            self.generation += 1
+            self.target = level
+            generation = self.generation
+            # the staged images were decoded for the previous target
+            asset_cache.discard_staged()
+            if level in self.ready:
+                return
+
+        worker = threading.Thread(target=self.work, args=(level, generation), daemon=True)
+        worker.start()
+
+    def stop(self):
+        """Stops the running worker, if any, before it decodes its next file. The images it staged are kept."""
+        with self.lock:
+            self.generation += 1
+            self.target = None
+
+    def cancel(self):
+        """Stops the running worker, if any, and drops the images it staged."""
+        with self.lock:
+            self.generation += 1
+            self.target = None
+            asset_cache.discard_staged()
+
+    def is_current(self, generation):
+        """Returns True if a worker started for generation should keep going."""
+        return generation == self.generation
+
+    def work(self, level, generation):
+        """Parses the layouts of a level and decodes its images, runs on the worker thread.
+            Only decoding happens here. Converting the surfaces to the display format is left to the main thread.
+
+            Parameters:
+                level: Index of the level in game_data.levels.
+                generation: Generation the worker was started for.
+        """
+        with tracer.span('preload level', level=level):
+            layouts = load_layouts(levels[level])
+            with self.lock:
+                if not self.is_current(generation):
+                    return
+                self.ready[level] = layouts
+
+            for path in level_asset_paths(layouts):
+                if not self.is_current(generation):
+                    return
+                if asset_cache.contains(path):
+                    continue
+                for file_path in image_files(path):
+                    if file_path in asset_cache.staged:
+                        continue
+                    surface = pygame.image.load(file_path)
+                    with self.lock:
+                        # the main thread may have moved on or loaded the asset itself while the file was decoded
+                        if not self.is_current(generation):
+                            return
+                        if asset_cache.contains(path):
+                            break
+                        if not asset_cache.stage(file_path, surface):
+                            # the memory limit is reached, the rest is loaded when the level is built
+                            return
+
+    def take(self, level):
+        """Hands over the prepared layouts of a level and stops any background work.
+            The staged images are kept for building the level, call release once it is built.
+
+            Parameters:
+                level: Index of the level that is about to be built.
+
+            Returns: The layouts of the level, or None if the worker has not finished parsing them yet.
+        """
+        self.stop()
+        with self.lock:
+            return self.ready.pop(level, None)
+
+    def release(self):
+        """Drops the staged images that building the level taken with take did not use."""
+        asset_cache.discard_staged()
@@ -0,0 +1,235 @@
+"""The profiler.py module times the named phases of every frame and shows their rolling percentiles in an overlay.
+    The game marks the start of each phase with profiler.mark(name). A mark ends the phase before it, so timing a
+    sequence of steps costs one call per step. While the profiler is disabled a mark returns right away, so the marks
+    can stay in the game loop. Press the profiler_key (F3 by default) in game to show the overlay. With
+    hitch_phase_timing set in the settings the phases of every frame are timed for the hitch detector, the overlay
+    only adds keeping their percentiles.
+    While the frame tracer records (see frame_trace.py), every phase and span is also added to its ring buffer.
+"""
+
+import textwrap
+from collections import deque
+from time import perf_counter
+import pygame
+from contextlib import contextmanager
+from settings import profiler_window, profiler_key, trace_key, hitch_phase_timing
+from frame_trace import tracer
+
+
+def percentile(ordered, fraction):
+    """Returns the value at a fraction between 0 and 1 of a sorted list, which must not be empty."""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FrameProfiler:
+    """Accumulates the time spent in each named phase of a frame and keeps the totals of the last frames.
+
+        Attributes:
+            enabled: Whether phases are timed, which is the case while phase_timing or timing is on or the tracer
+                records.
+            phase_timing: Whether the phases of every frame are timed for the hitch detector.
+            timing: Whether the percentiles of the phases are kept.
+            show_overlay: Whether the overlay is drawn.
+            window: Number of frames the percentiles are computed over.
+            samples: Dictionary mapping each phase to the milliseconds it took in the last frames it ran in.
+            frame_samples: Milliseconds of the last whole frames.
+            frame_phases: Dictionary mapping each phase that ran in the current frame to its milliseconds so far.
+            last_frame: frame_phases of the last finished frame.
+            phase: Name of the phase currently being timed, None between frames.
+            phase_start: perf_counter time at which the current phase started.
+            frame_start: perf_counter time at which the current frame started.
+            frames: Number of finished frames since the profiler was enabled.
+            overlay: Surface with the rendered overlay, refreshed every few frames.
+            notes: Function without arguments returning lines of text shown below the phases, or None.
+    """
+    def __init__(self, window=profiler_window, phase_timing=hitch_phase_timing):
+        """Initializes a profiler without an overlay.
+
+            Parameters:
+                window (optional): Number of frames the percentiles are computed over.
+                    Defaults to profiler_window from the settings.
+                phase_timing (optional): Whether the phases of every frame are timed for the hitch detector.
+                    Defaults to hitch_phase_timing from the settings.
+        """
+        self.phase_timing = phase_timing
+        self.enabled = phase_timing
+        self.timing = False
+        self.show_overlay = False
+        self.window = window
+        self.samples = {}
+        self.frame_samples = deque(maxlen=window)
+        self.frame_phases = {}
+        self.last_frame = {}
+        self.phase = None
+        self.phase_start = 0
+        self.frame_start = 0
+        self.frames = 0
+        self.overlay = None
+        self.font = None
+        self.notes = None
+
+    def toggle(self):
+        """Starts keeping the percentiles and shows the overlay, or stops and hides both."""
+        self.timing = not self.timing
+        self.show_overlay = self.timing
+        self.enabled = self.phase_timing or self.timing or tracer.enabled
+        self.reset()
+
+    def start_tracing(self):
+        """Starts recording every phase, span and frame into the tracer."""
+        tracer.start()
+        self.enabled = True
+
+    def stop_tracing(self):
+        """Stops recording into the tracer and saves the trace.
+
+            Returns: Path of the saved trace file.
+        """
+        tracer.stop()
+        self.enabled = self.phase_timing or self.timing
+        if not self.enabled:
+            self.last_frame = {}
+        return tracer.save()
+
+    def reset(self):
+        """Forgets all timed frames."""
+        self.samples = {}
+        self.frame_samples.clear()
+        self.frame_phases = {}
+        self.last_frame = {}
+        self.phase = None
+        self.frames = 0
+        self.overlay = None
+
+    def begin_frame(self):
+        """Starts timing a frame."""
+        if not self.enabled:
+            return
+        self.frame_start = self.phase_start = perf_counter()
+        self.frame_phases = {}
+        self.phase = None
+
+    def mark(self, phase):
+        """Ends the current phase and starts timing the next one.
+
+            Parameters:
+                phase: Name of the phase that starts now.
+        """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        if self.phase is not None:
+            self.frame_phases[self.phase] = self.frame_phases.get(self.phase, 0) + (now - self.phase_start) * 1000
+            if tracer.enabled:
+                tracer.add(self.phase, self.phase_start, now)
+        self.phase = phase
+        self.phase_start = now
+
+    @contextmanager
+    def span(self, name, **args):
+        """Context manager timing the code it wraps as one span of the trace, with the phases inside it nested.
+            The current phase ends when the span starts, and the last phase inside it ends with the span. Time inside
+            the span that no phase was marked for, like building a level, is timed as the phase '<name> (self)'.
+
+            Parameters:
+                name: Name of the span.
+                args: Values shown with the span in the trace.
+        """
+        if not self.enabled:
+            yield
+            return
+        # a distinct name keeps the phase from showing up as a second span of the same name in the trace
+        self.mark(name + ' (self)')
+        start = self.phase_start
+        try:
+            yield
+        finally:
+            self.mark(None)
+            if tracer.enabled:
+                tracer.add(name, start, self.phase_start, 'span', args or None)
+
+    def end_frame(self):
+        """Ends the current phase and the frame, and adds their times to the rolling window."""
+        if not self.enabled:
+            return
+        self.mark(None)
+        if tracer.enabled:
+            tracer.add('frame', self.frame_start, self.phase_start, 'frame')
+        self.last_frame = self.frame_phases
+        if not self.timing:
+            return
+        self.frame_samples.append((self.phase_start - self.frame_start) * 1000)
+        for phase, milliseconds in self.frame_phases.items():
+            samples = self.samples.get(phase)
+            if samples is None:
+                samples = self.samples[phase] = deque(maxlen=self.window)
+            samples.append(milliseconds)
+        self.frames += 1
+
+    def slowest_phase(self):
+        """Returns the (phase, milliseconds) pair that took longest in the last frame, or None."""
+        if not self.last_frame:
+            return None
+        return max(self.last_frame.items(), key=lambda item: item[1])
+
+    def percentiles(self):
+        """Returns a list of (phase, p50, p95, p99) in milliseconds for every phase, slowest p99 first."""
+        rows = []
+        for phase, samples in self.samples.items():
+            ordered = sorted(samples)
+            rows.append((phase, percentile(ordered, 0.5), percentile(ordered, 0.95), percentile(ordered, 0.99)))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def render_overlay(self):
+        """Renders the percentiles of the frame and of every phase, and the notes, into the overlay surface."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+
+        ordered = sorted(self.frame_samples)
+        rows = [('phase (ms)', 'p50', 'p95', 'p99'),
+                ('whole frame', percentile(ordered, 0.5), percentile(ordered, 0.95), percentile(ordered, 0.99))]
+        rows.extend(self.percentiles())
+        notes = [line for note in (self.notes() if self.notes else []) for line in textwrap.wrap(note, 58)]
+
+        line_height = self.font.get_linesize()
+        self.overlay = pygame.Surface((360, line_height * (len(rows) + len(notes)) + 8), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 170))
+        for index, (phase, *values) in enumerate(rows):
+            y = 4 + index * line_height
+            self.overlay.blit(self.font.render(phase, True, 'white'), (6, y))
+            # the default font is not monospaced, so every column is rendered on its own
+            for column, value in enumerate(values):
+                text = value if isinstance(value, str) else f'{value:.2f}'
+                self.overlay.blit(self.font.render(text, True, 'white'), (190 + column * 56, y))
+        for index, note in enumerate(notes, len(rows)):
+            self.overlay.blit(self.font.render(note, True, 'white'), (6, 4 + index * line_height))
+
+    def draw(self, surface):
+        """Draws the overlay in the top right corner of a surface, if it is shown.
+
+            Parameters:
+                surface: Surface to draw the overlay on.
+        """
+        if not self.show_overlay or not self.frame_samples:
+            return
+        # re-rendering the text every frame would show up in the measurements
+        if self.overlay is None or self.frames % 15 == 0:
+            self.render_overlay()
+        surface.blit(self.overlay, (surface.get_width() - self.overlay.get_width() - 10, 10))
+
+    def handle_event(self, event):
+        """Toggles the profiler when the profiler_key is pressed, and starts a trace or saves the running one when the
+            trace_key is pressed.
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key == profiler_key:
+                self.toggle()
+            elif event.key == trace_key:
+                if tracer.enabled:
+                    print('trace saved to', self.stop_tracing())
+                else:
+                    self.start_tracing()
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,183 @@
+"""The replay.py module records the games played on a level and replays them headless.
+    A level is fully determined by its seed, the health and coins the player enters it with and the controls of every
+    update, so that is all a recording stores: a small header followed by one byte of controls per update. Every
+    hash_interval updates a hash of the level state is stored as well, and a replay checks it to find the first
+    update at which the replayed game took another course than the recorded one.
+
+    Run this module from the code folder to replay a recording as fast as possible and check its state hashes:
+        python replay.py ../replays/<recording>.qfr
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from settings import replay_folder, replay_hash_interval, replay_files_kept
+from support import remove_oldest_files
+from simulation import pack_controls, unpack_controls
+from headless import HeadlessGame
+
+MAGIC = b'QFBR'
+VERSION = 1
+
+# magic, version, level index, seed, health and coins at the start, hash interval, number of updates
+HEADER = struct.Struct('=4sHHQhIHI')
+
+
+def state_hash(level, health, coins):
+    """Returns a 64-bit hash of the state of a level that changes whenever the game takes another course.
+
+        Parameters:
+            level: The Level being played.
+            health: Current health points of the player.
+            coins: Number of coins collected.
+    """
+    player = level.player.sprite
+    values = [level.clock.time, level.camera.offset_x, health, coins, *player.collision_rect,
+              player.direction.x, player.direction.y, player.blink.active]
+    for group in level.moving_groups + [level.coin_sprites, level.health_sprites, level.explosion_sprites]:
+        values.append(len(group))
+        for sprite in group:
+            values.extend(sprite.rect.topleft)
+    values.extend(enemy.speed for enemy in level.enemy_sprites)
+    values.extend(boss.health for boss in level.boss_sprite)
+    digest = hashlib.blake2b(array('d', values).tobytes(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class Recording:
+    """The controls of every update of one game on a level, with the state hashes to check a replay against.
+
+        Attributes:
+            level: Index of the level in game_data.levels.
+            seed: Seed of the level's random number generator.
+            health: Health points the player entered the level with.
+            coins: Number of coins collected before entering the level.
+            hash_interval: Number of updates between two stored state hashes.
+            controls: Bytes of controls bitmasks, one per update.
+            hashes: State hashes after every hash_interval-th update.
+    """
+    def __init__(self, level, seed, health, coins, hash_interval=replay_hash_interval):
+        """Initializes an empty recording.
+
+            Parameters:
+                level: Index of the level in game_data.levels.
+                seed: Seed of the level's random number generator.
+                health: Health points the player entered the level with.
+                coins: Number of coins collected before entering the level.
+                hash_interval (optional): Number of updates between two state hashes.
+                    Defaults to replay_hash_interval from the settings.
+        """
+        self.level = level
+        self.seed = seed
+        self.health = health
+        self.coins = coins
+        self.hash_interval = hash_interval
+        self.controls = bytearray()
+        self.hashes = array('Q')
+
+    def record(self, controls, level, health, coins):
+        """Appends the controls of an update, called after the update ran.
+
+            Parameters:
+                controls: Controls held down during the update.
+                level: The Level being played.
+                health: Current health points of the player.
+                coins: Number of coins collected.
+        """
+        self.controls.append(pack_controls(controls))
+        if len(self.controls) % self.hash_interval == 0:
+            self.hashes.append(state_hash(level, health, coins))
+
+    def save(self, path=None):
+        """Writes the recording to a file.
+
+            Parameters:
+                path (optional): Path of the file. Defaults to a new file in replay_folder from the settings,
+                    the oldest replays in the folder are then deleted to keep replay_files_kept of them.
+                    A number is added to the name if a replay of the same level and seed was saved in the same second,
+                    like a retry of a level taken from the level cache.
+
+            Returns: Path of the written file.
+        """
+        prune = path is None
+        if prune:
+            os.makedirs(replay_folder, exist_ok=True)
+            name = f'{replay_folder}/level_{self.level}_{time.strftime("%Y%m%d-%H%M%S")}_{self.seed}'
+            path = f'{name}.qfr'
+            number = 1
+            while True:
+                try:
+                    file = open(path, 'xb')
+                    break
+                except FileExistsError:
+                    number += 1
+                    path = f'{name}_{number}.qfr'
+        else:
+            file = open(path, 'wb')
+
+        with file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.level, self.seed, self.health, self.coins,
+                                   self.hash_interval, len(self.controls)))
+            file.write(self.controls)
+            self.hashes.tofile(file)
+        if prune:
+            remove_oldest_files(replay_folder, '.qfr', replay_files_kept)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Reads a recording written by save.
+
+            Parameters:
+                path: Path of the file.
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        magic, version, level, seed, health, coins, hash_interval, updates = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} recording')
+
+        recording = cls(level, seed, health, coins, hash_interval)
+        recording.controls = bytearray(data[HEADER.size:HEADER.size + updates])
+        recording.hashes.frombytes(data[HEADER.size + updates:])
+        return recording
+
+
+def replay(recording):
+    """Replays a recording headless as fast as possible and checks its state hashes.
+
+        Parameters:
+            recording: The Recording to replay.
+
+        Returns: Tuple of the HeadlessGame after the replay and the first update whose state hash differs from the
+            recorded one, None if all hashes matched.
+    """
+    game = HeadlessGame(recording.level, seed=recording.seed, health=recording.health, coins=recording.coins)
+    hashes = iter(recording.hashes)
+    for update, bits in enumerate(recording.controls, 1):
+        game.step(unpack_controls(bits))
+        if update % recording.hash_interval == 0:
+            expected = next(hashes, None)
+            if expected is not None and expected != state_hash(game.level, game.current_health, game.coin_amount):
+                return game, update
+    return game, None
+
+
+if __name__ == '__main__':
+    recording = Recording.load(sys.argv[1])
+    start = time.perf_counter()
+    game, diverged = replay(recording)
+    elapsed = time.perf_counter() - start
+
+    print(f'level {recording.level}, seed {recording.seed}: {len(recording.controls)} updates '
+          f'replayed in {elapsed:.3f}s, {game.result or "still playing"}, health {game.current_health}, '
+          f'coins {game.coin_amount}')
+    if diverged is None:
+        print(f'all {len(recording.hashes)} state hashes match')
+    else:
+        print(f'state diverged from the recording by update {diverged}')
+        sys.exit(1)
@@ -1,6 +1,72 @@
+import pygame
+
 vertical_tile_number = 13
 # scale factor to make the size dynamic
 tile_size = 64
 
 screen_height = vertical_tile_number * tile_size
 screen_width = 1500
+
+# upper bound for the memory used by decoded images in support.asset_cache (in bytes)
+asset_cache_limit = 64 * 1024 * 1024
+
+# sprites are still drawn while they are this many pixels outside the screen
+cull_margin = tile_size
+
+# width of the surfaces static layers are baked into, the smallest multiple of the tile size wider than the screen
+chunk_width = (screen_width // tile_size + 1) * tile_size
+
+# factors applied to the camera movement when scrolling the background layers, 1 scrolls with the level
+cloud_parallax = 0.5
+water_parallax = 1
+
+# number of simulation updates per second of game time
+simulation_rate = 60
+# at most this many simulation updates run per rendered frame, slower machines drop the time they cannot simulate
+max_updates_per_frame = 5
+# upper bound for the rendered frames per second, 0 renders as fast as possible
+render_fps = 120
+
+# every game played on a level is recorded to a replay file in this folder, see replay.py
+record_replays = True
+replay_folder = '../replays'
+# number of replay files kept in replay_folder, the oldest ones are deleted when a new one is saved
+replay_files_kept = 50
+# number of updates between two state hashes stored in a replay
+replay_hash_interval = 60
+
+# number of recently played levels kept built, so entering one of them again is instantaneous
+level_cache_size = 3
+
+# number of frames the profiler overlay computes its percentiles over
+profiler_window = 300
+# key that toggles the profiler and its overlay
+profiler_key = pygame.K_F3
+
+# pressing trace_key starts recording the spans of the last frames, pressing it again saves them as a Chrome trace,
+# set trace_frames to record from the start, the trace is then saved on exit
+trace_frames = False
+# number of spans kept, a frame in a level records about 40, so this covers roughly the last ten seconds
+trace_buffer_size = 20000
+trace_folder = '../traces'
+# number of saved traces kept in trace_folder, older ones are deleted
+trace_files_kept = 10
+# key that starts recording a trace and saves it
+trace_key = pygame.K_F4
+
+# number of frames benchmark.py runs on each level, and the results it compares new runs against
+benchmark_frames = 1200
+benchmark_baseline = '../benchmarks/baseline.json'
+# fraction by which each benchmark metric may grow over the baseline before the run fails
+benchmark_thresholds = {'init_ms': 0.25, 'init_peak_kib': 0.10, 'frame_p50_ms': 0.15, 'frame_p99_ms': 0.30,
+                        'surface_kib': 0.10}
+
+# milliseconds a frame may take before it counts as a hitch, and the number of hitches whose context is kept
+hitch_budget = 1000 / 60
+hitch_log_size = 200
+# whether the profiler times the phases of every frame, so the hitch detector knows the slowest phase of a hitch
+# without the overlay or a trace running
+hitch_phase_timing = True
+
+# key that prints the surface memory report
+memory_key = pygame.K_F5
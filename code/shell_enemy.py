@@ -1,6 +1,5 @@
 """This module defines a class representing shell enemies that can shoot projectiles(pearls)."""
 
-import pygame
 from tiles import AnimatedTile
 from support import import_folder
 from pearl import Pearl
@@ -19,8 +18,9 @@ class Shell(AnimatedTile):
             attack_state: Flag indicating whether the shell enemy is in attack state.
             idle_frames: List of idle animation frames for the shell enemy.
             attack_frames: List of attack animation frames for the shell enemy.
+            clock: SimulationClock of the level.
     """
-    def __init__(self, size, x, y, direction):
+    def __init__(self, size, x, y, direction, clock):
         """Initializes a Shell object with a specified size, position, and direction.
 
             Parameters:
@@ -28,6 +28,7 @@ class Shell(AnimatedTile):
                 x: X-coordinate of the shell enemy.
                 y: Y-coordinate of the shell enemy.
                 direction: Direction of the shell enemy (left or right).
+                clock: SimulationClock of the level, times the reloading.
         """
         super().__init__(size, x, y, '../graphics/enemy/shell_' + direction + '/idle')
 
@@ -41,12 +42,12 @@ class Shell(AnimatedTile):
         self.attack_state = False
         self.idle_frames = import_folder('../graphics/enemy/shell_' + self.direction + '/idle')
         self.attack_frames = import_folder('../graphics/enemy/shell_' + self.direction + '/attack')
+        self.clock = clock
 
     def shoot(self):
         """Initiates a shooting action by the shell enemy if not in attack state."""
         if not self.attack_state:
-            print('shot')
-            self.time_of_shot = pygame.time.get_ticks()
+            self.time_of_shot = self.clock.get_ticks()
             # if self.direction == 'left':
             self.frames = self.attack_frames
             self.attack_state = True
@@ -58,20 +59,22 @@ class Shell(AnimatedTile):
             # if self.direction == 'left':
             # else:
             #     self.frames = import_folder('../graphics/enemy/shell_right/idle')
-            current_time = pygame.time.get_ticks()
-            print('tick')
+            current_time = self.clock.get_ticks()
             if current_time - self.time_of_shot >= self.reload_time:
                 self.attack_state = False
                 self.frames = self.idle_frames
 
-    def update(self, x_shift, surface=None):
-        """Updates the position and animation of the shell enemy.
+    def snapshot(self):
+        """Returns the animation, attack and reload state of the shell as a tuple, see restore."""
+        return super().snapshot(), self.attack_state, self.time_of_shot, self.pearl
 
-            Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the shell enemy on. Defaults to None.
-        """
-        self.rect.x += x_shift
+    def restore(self, state):
+        """Puts the shell back into a state returned by snapshot."""
+        tile_state, self.attack_state, self.time_of_shot, self.pearl = state
+        super().restore(tile_state)
+
+    def update(self):
+        """Updates the animation and reload timer of the shell enemy."""
         self.animate()
         self.reload_timer()
 
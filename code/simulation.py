@@ -0,0 +1,56 @@
+"""The simulation.py module holds the input state and the clock a Level is stepped with.
+    A Level no longer reads the keyboard or the wall clock itself. It is handed the controls of every update and keeps
+    its own SimulationClock that advances by a fixed step per update, so a level behaves the same whether it is played
+    in the window or stepped headless as fast as possible.
+"""
+
+from collections import namedtuple
+import pygame
+from settings import simulation_rate
+
+# state of the player controls during one update
+Controls = namedtuple('Controls', ['left', 'right', 'jump'])
+
+# no control pressed
+NO_CONTROLS = Controls(False, False, False)
+
+
+def pack_controls(controls):
+    """Returns the Controls as a bitmask, left is bit 0, right bit 1 and jump bit 2."""
+    return controls.left | controls.right << 1 | controls.jump << 2
+
+
+def unpack_controls(bits):
+    """Returns the Controls stored in a bitmask made by pack_controls."""
+    return Controls(bool(bits & 1), bool(bits & 2), bool(bits & 4))
+
+
+def read_keyboard():
+    """Returns the Controls currently held down on the keyboard."""
+    keys = pygame.key.get_pressed()
+    return Controls(bool(keys[pygame.K_a]), bool(keys[pygame.K_d]), bool(keys[pygame.K_SPACE]))
+
+
+class SimulationClock:
+    """Game time of a level, advanced by a fixed step on every update instead of read from the wall clock.
+
+        Attributes:
+            step: Milliseconds the clock advances per update.
+            time: Milliseconds of game time since the level was created.
+    """
+    def __init__(self, step=1000 / simulation_rate):
+        """Initializes a clock at time 0.
+
+            Parameters:
+                step (optional): Milliseconds per update. Defaults to one update at simulation_rate from the settings.
+        """
+        self.step = step
+        self.time = 0
+
+    def tick(self):
+        """Advances the clock by one update."""
+        self.time += self.step
+
+    def get_ticks(self):
+        """Returns the game time in milliseconds, used in place of pygame.time.get_ticks."""
+        return self.time
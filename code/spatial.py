@@ -0,0 +1,91 @@
+"""This module defines a uniform grid spatial index used for collision detection.
+    Sprites are bucketed by the grid cells their rectangles overlap, so a collision query only has to look at the
+    handful of sprites in the cells around the queried rectangle, however many sprites the level contains.
+"""
+
+from settings import tile_size
+
+
+class SpatialHash:
+    """Uniform grid of cells, each holding the sprites whose rectangles overlap it.
+        Static sprites are bucketed once. Moving sprites are tracked and only re-bucketed when they cross into other cells.
+
+        Attributes:
+            cell_size: Width and height of a grid cell.
+            cells: Dictionary mapping a (column, row) cell to the list of sprites overlapping it.
+            order: Dictionary mapping each sprite to the order it was added in, used to sort query results.
+            moving: Dictionary mapping each moving sprite to the cells it is currently bucketed in.
+    """
+    def __init__(self, cell_size=tile_size):
+        """Initializes an empty grid.
+
+            Parameters:
+                cell_size (optional): Width and height of a grid cell. Defaults to tile_size from the settings.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+        self.moving = {}
+
+    def cells_for(self, rect):
+        """Returns the (column, row) cells a rectangle overlaps."""
+        size = self.cell_size
+        return [(col, row)
+                for col in range(rect.left // size, (rect.right - 1) // size + 1)
+                for row in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def add(self, sprite, moving=False):
+        """Adds a sprite to the grid.
+
+            Parameters:
+                sprite: Sprite with a rect attribute.
+                moving (optional): Whether the sprite moves and has to be re-bucketed by update. Defaults to False.
+        """
+        self.order[sprite] = len(self.order)
+        cells = self.cells_for(sprite.rect)
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(sprite)
+        if moving:
+            self.moving[sprite] = cells
+
+    def add_group(self, group, moving=False):
+        """Adds every sprite of a group to the grid, in the group's order."""
+        for sprite in group:
+            self.add(sprite, moving)
+
+    def remove(self, sprite):
+        """Removes a sprite from the grid."""
+        cells = self.moving.pop(sprite, None) or self.cells_for(sprite.rect)
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket and sprite in bucket:
+                bucket.remove(sprite)
+        self.order.pop(sprite, None)
+
+    def update(self):
+        """Moves every moving sprite into the buckets of the cells it overlaps now.
+            Sprites that stayed within the same cells are left untouched, and sprites that were killed are removed.
+        """
+        for sprite, old_cells in list(self.moving.items()):
+            if not sprite.alive():
+                self.remove(sprite)
+                continue
+
+            new_cells = self.cells_for(sprite.rect)
+            if new_cells != old_cells:
+                for cell in old_cells:
+                    self.cells[cell].remove(sprite)
+                for cell in new_cells:
+                    self.cells.setdefault(cell, []).append(sprite)
+                self.moving[sprite] = new_cells
+
+    def query(self, rect):
+        """Returns the sprites bucketed in the cells a rectangle overlaps, in the order they were added.
+            The result may contain sprites that do not overlap the rectangle itself.
+        """
+        found = set()
+        for cell in self.cells_for(rect):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return sorted(found, key=self.order.__getitem__)
@@ -1,18 +1,256 @@
 from csv import reader
-from settings import tile_size
-from os import walk
+from collections import OrderedDict
+from settings import tile_size, asset_cache_limit
+from os import walk, listdir, remove
+from os.path import join, getmtime
+from threading import Lock
 import pygame
 
 
+class AssetCache:
+    """Process-wide cache of decoded surfaces, keyed by asset path.
+        Every entity class loads its images through this cache, so each image is decoded once per process
+        no matter how many sprites use it. Cached surfaces are shared between all users and must not be mutated.
+
+        Attributes:
+            memory_limit: Maximum number of bytes the cached surfaces may use before old entries are evicted.
+            memory_used: Number of bytes currently held by the cached surfaces.
+            hits: Number of requests answered from the cache.
+            misses: Number of requests that had to load the asset from disk.
+            staged: Images decoded ahead of time by a worker thread, waiting to be converted on the main thread.
+            staged_memory: Number of bytes held by the staged images, they count towards the memory limit as well.
+    """
+    def __init__(self, memory_limit):
+        """Initializes an empty cache.
+
+            Parameters:
+                memory_limit: Maximum number of bytes the cached surfaces may use.
+        """
+        self.memory_limit = memory_limit
+        self.memory_used = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (asset, size in bytes), ordered from least to most recently used
+        self.entries = OrderedDict()
+        # asset path -> number of entries loaded from it, so a path is looked up without scanning the entries
+        self.paths = {}
+        # file path -> decoded, not yet converted surface
+        self.staged = {}
+        self.staged_memory = 0
+        self.staged_lock = Lock()
+
+    def get(self, key, loader):
+        """Returns the asset stored under key, calling loader to create it on a miss.
+
+            Parameters:
+                key: Hashable key identifying the asset.
+                loader: Function without arguments that loads the asset (a surface or a list of surfaces).
+
+            Returns: The cached asset.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        asset = loader()
+        size = surface_memory(asset)
+        self.entries[key] = (asset, size)
+        self.paths[key[1]] = self.paths.get(key[1], 0) + 1
+        self.memory_used += size
+        self.evict()
+        return asset
+
+    def contains(self, path):
+        """Returns True if an asset loaded from path is in the cache."""
+        return path in self.paths
+
+    def stage(self, path, surface):
+        """Stores an image decoded off the main thread, so the next load of path only has to convert it.
+            Safe to call from any thread. An image that would take the cache and the staged images over the memory
+            limit is not stored.
+
+            Parameters:
+                path: Path of the image file.
+                surface: Surface returned by pygame.image.load for that file.
+
+            Returns: True if the image was stored.
+        """
+        size = surface_memory(surface)
+        with self.staged_lock:
+            if path in self.staged:
+                return True
+            if self.memory_used + self.staged_memory + size > self.memory_limit:
+                return False
+            self.staged[path] = surface
+            self.staged_memory += size
+        return True
+
+    def discard_staged(self):
+        """Drops every staged image, for example when the level they were decoded for will not be built."""
+        with self.staged_lock:
+            self.staged.clear()
+            self.staged_memory = 0
+
+    def decode(self, path):
+        """Returns the decoded image at path, taking it from the staged images when a worker already decoded it."""
+        with self.staged_lock:
+            surface = self.staged.pop(path, None)
+            if surface is not None:
+                self.staged_memory -= surface_memory(surface)
+        if surface is None:
+            surface = pygame.image.load(path)
+        return surface
+
+    def evict(self):
+        """Drops the least recently used entries until the cache fits in its memory limit.
+            The most recently used entry is always kept, even if it is larger than the limit on its own.
+        """
+        while self.memory_used > self.memory_limit and len(self.entries) > 1:
+            key, (__, size) = self.entries.popitem(last=False)
+            self.memory_used -= size
+            self.forget_path(key[1])
+
+    def forget_path(self, path):
+        """Counts one entry less as loaded from path, after the entry was removed."""
+        count = self.paths[path] - 1
+        if count:
+            self.paths[path] = count
+        else:
+            del self.paths[path]
+
+    def invalidate(self, path=None):
+        """Removes cached assets, forcing them to be loaded from disk on their next use.
+
+            Parameters:
+                path (optional): Asset path to invalidate. Defaults to None, which clears the whole cache.
+        """
+        if path is None:
+            self.entries.clear()
+            self.paths.clear()
+            self.memory_used = 0
+            self.discard_staged()
+            return
+
+        for key in [key for key in self.entries if key[1] == path]:
+            _, size = self.entries.pop(key)
+            self.memory_used -= size
+        self.paths.pop(path, None)
+        with self.staged_lock:
+            surface = self.staged.pop(path, None)
+            if surface is not None:
+                self.staged_memory -= surface_memory(surface)
+
+    def stats(self):
+        """Returns the cache counters.
+
+            Returns: Dictionary with the hit and miss counts, the number of entries, the bytes in use and the number
+                and bytes of the staged images.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries), 'bytes': self.memory_used,
+                'staged': len(self.staged), 'staged_bytes': self.staged_memory}
+
+    def report(self):
+        """Returns a one line, human readable summary of the cache counters."""
+        requests = self.hits + self.misses
+        hit_rate = self.hits / requests * 100 if requests else 0
+        return (f'asset cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate), '
+                f'{len(self.entries)} entries, {self.memory_used / 1024:.0f} KiB, '
+                f'{len(self.staged)} staged images, {self.staged_memory / 1024:.0f} KiB')
+
+
+def surface_memory(asset):
+    """Returns the number of bytes used by the pixels of a surface or a list of surfaces."""
+    if isinstance(asset, pygame.Surface):
+        return asset.get_pitch() * asset.get_height()
+    return sum(surface_memory(surface) for surface in asset)
+
+
+asset_cache = AssetCache(asset_cache_limit)
+
+
+def remove_oldest_files(folder, suffix, keep):
+    """Deletes the oldest files with a suffix in a folder, so that at most keep of them are left.
+
+        Parameters:
+            folder: Folder holding the files.
+            suffix: File name suffix of the files to consider, like '.qfr'.
+            keep: Number of the most recently modified files that are kept.
+    """
+    paths = [join(folder, name) for name in listdir(folder) if name.endswith(suffix)]
+    paths.sort(key=getmtime)
+    for old_path in paths[:max(0, len(paths) - keep)]:
+        remove(old_path)
+
+
+def convert_image(surface, alpha=True):
+    """Converts a decoded image to the pixel format of the display for fast blitting.
+        Without a display, as in headless simulations, the decoded image is returned unchanged.
+
+        Parameters:
+            surface: Decoded image surface.
+            alpha (optional): Whether to keep per pixel transparency. Defaults to True.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class NullSound:
+    """Silent stand-in for pygame.mixer.Sound, used when the mixer is not initialised."""
+    def play(self, loops=0):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, value):
+        pass
+
+
+def import_sound(path, volume=1.0):
+    """Loads a sound effect, or a NullSound when the mixer is not initialised.
+
+        Parameters:
+            path: Path to the sound file.
+            volume (optional): Volume of the sound between 0 and 1. Defaults to 1.
+    """
+    if not pygame.mixer.get_init():
+        return NullSound()
+    sound = pygame.mixer.Sound(path)
+    sound.set_volume(volume)
+    return sound
+
+
+def import_image(path, alpha=True):
+    """Loads a single image through the asset cache.
+
+        Parameters:
+            path: Path to the image file.
+            alpha (optional): Whether to keep per pixel transparency. Defaults to True.
+
+        Returns: The shared surface for the image.
+    """
+    def load():
+        return convert_image(asset_cache.decode(path), alpha)
+
+    return asset_cache.get(('image', path, alpha), load)
+
+
 def import_folder(path):
-    surface_list = []
-    for _, __, image_file in walk(path):
-        for image in image_file:
-            full_path = path + '/' + image
-            image_surface = pygame.image.load(full_path).convert_alpha()
-            surface_list.append(image_surface)
+    def load():
+        surface_list = []
+        for _, __, image_file in walk(path):
+            for image in image_file:
+                full_path = path + '/' + image
+                image_surface = convert_image(asset_cache.decode(full_path))
+                surface_list.append(image_surface)
+
+        return surface_list
 
-    return surface_list
+    return asset_cache.get(('folder', path), load)
 
 
 def import_csv_layout(path):
@@ -25,22 +263,91 @@ def import_csv_layout(path):
 
 
 def import_cut_graphics(path):
-    surface = pygame.image.load(path).convert_alpha()
-    tile_num_x = int(surface.get_size()[0] / tile_size)
-    tile_num_y = int(surface.get_size()[1] / tile_size)
+    def load():
+        surface = convert_image(asset_cache.decode(path))
+        tile_num_x = int(surface.get_size()[0] / tile_size)
+        tile_num_y = int(surface.get_size()[1] / tile_size)
+
+        cut_tiles = []
+
+        for row in range(tile_num_y):
+            for col in range(tile_num_x):
+                x = col * tile_size
+                y = row * tile_size
+                # flags gives surfaces different kind of values to make them behave differently
+                # SRCALPHA sets the unusable pixels invisible
+                new_surface = pygame.Surface((tile_size, tile_size), flags=pygame.SRCALPHA)
+                new_surface.blit(surface, (0, 0), pygame.Rect(x, y, tile_size, tile_size))
+                cut_tiles.append(new_surface)
+
+        return cut_tiles
+
+    return asset_cache.get(('tiles', path), load)
+
+
+class Tileset:
+    """A tile sheet cut into tile_size tiles once, handing out the shared tile surfaces by GID.
+        The tiles come from import_cut_graphics, so every Tileset for the same sheet shares the same surfaces.
+
+        Attributes:
+            path: Path to the tile sheet image.
+            firstgid: GID of the first tile in the sheet.
+            tiles: List of the cut tile surfaces.
+    """
+    def __init__(self, path, firstgid=0):
+        """Initializes a Tileset for the sheet at path.
+
+            Parameters:
+                path: Path to the tile sheet image.
+                firstgid (optional): GID of the first tile in the sheet. Defaults to 0, the numbering of the CSV layouts.
+        """
+        self.path = path
+        self.firstgid = firstgid
+        self.tiles = import_cut_graphics(path)
+
+    def get(self, gid):
+        """Returns the shared surface of the tile with the given GID."""
+        return self.tiles[gid - self.firstgid]
+
+    def __len__(self):
+        return len(self.tiles)
+
+
+def import_flipped_folder(path):
+    """Loads the frames of a folder mirrored horizontally, through the asset cache.
+
+        Parameters:
+            path: Path to the folder containing the frames.
+
+        Returns: The shared list of mirrored surfaces, in the same order as import_folder(path).
+    """
+    return asset_cache.get(('flipped', path),
+                           lambda: [pygame.transform.flip(frame, True, False) for frame in import_folder(path)])
+
 
-    cut_tiles = []
+class AnimationBank:
+    """Animation frames of a character in their original orientation and mirrored horizontally.
+        Both variants are built once at load time and shared through the asset cache, so facing the other way
+        only selects another list instead of flipping a surface every frame.
 
-    for row in range(tile_num_y):
-        for col in range(tile_num_x):
-            x = col * tile_size
-            y = row * tile_size
-            # flags gives surfaces different kind of values to make them behave differently
-            # SRCALPHA sets the unusable pixels invisible
-            new_surface = pygame.Surface((tile_size, tile_size), flags=pygame.SRCALPHA)
-            new_surface.blit(surface, (0, 0), pygame.Rect(x, y, tile_size, tile_size))
-            cut_tiles.append(new_surface)
+        Attributes:
+            frames: Dictionary mapping each animation name to its frames in the original orientation.
+            flipped_frames: Dictionary mapping each animation name to its mirrored frames.
+    """
+    def __init__(self, paths):
+        """Loads both variants of every animation.
 
-    return cut_tiles
+            Parameters:
+                paths: Dictionary mapping each animation name to the folder containing its frames.
+        """
+        self.frames = {name: import_folder(path) for name, path in paths.items()}
+        self.flipped_frames = {name: import_flipped_folder(path) for name, path in paths.items()}
 
+    def get(self, name, flipped=False):
+        """Returns the frames of an animation.
 
+            Parameters:
+                name: Name of the animation.
+                flipped (optional): Whether to return the mirrored frames. Defaults to False.
+        """
+        return self.flipped_frames[name] if flipped else self.frames[name]
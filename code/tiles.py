@@ -3,7 +3,7 @@
     specific objects like crates, rum bottles, etc.
 """
 import pygame
-from support import import_folder
+from support import import_folder, import_image
 
 
 class Tile(pygame.sprite.Sprite):
@@ -25,15 +25,6 @@ class Tile(pygame.sprite.Sprite):
         self.image = pygame.Surface((size, size))
         self.rect = self.image.get_rect(topleft=(x, y))
 
-    def update(self, x_shift, surface=None):
-        """Updates the position of the tile based on the horizontal shift.
-
-            Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the tile.
-        """
-        self.rect.x += x_shift
-
 
 class StaticTile(Tile):
     """Represents a static tile with a fixed image.
@@ -70,7 +61,7 @@ class Crate(StaticTile):
                 x: X-coordinate of the crate's top-left corner.
                 y: Y-coordinate of the crate's top-left corner.
         """
-        super().__init__(size, x, y, pygame.image.load('../graphics/terrain/crate.png').convert_alpha())
+        super().__init__(size, x, y, import_image('../graphics/terrain/crate.png'))
         offset_y = y + size
         self.rect = self.image.get_rect(bottomleft=(x, offset_y))
 
@@ -90,7 +81,7 @@ class RumBottle(StaticTile):
                 x (int): X-coordinate of the rum bottle's top-left corner.
                 y (int): Y-coordinate of the rum bottle's top-left corner.
         """
-        super().__init__(size, x, y, pygame.image.load('../graphics/terrain/rum_bottle.png').convert_alpha())
+        super().__init__(size, x, y, import_image('../graphics/terrain/rum_bottle.png'))
         offset_y = y + size
         self.rect = self.image.get_rect(bottomleft=(x, offset_y))
 
@@ -110,7 +101,7 @@ class Spikes(StaticTile):
                 x: X-coordinate of the spikes' top-left corner.
                 y: Y-coordinate of the spikes' top-left corner.
         """
-        super().__init__(size, x, y, pygame.image.load('../graphics/enemy/spikes/spikes.png').convert_alpha())
+        super().__init__(size, x, y, import_image('../graphics/enemy/spikes/spikes.png'))
 
 
 class Treasure(StaticTile):
@@ -128,7 +119,7 @@ class Treasure(StaticTile):
                 x: X-coordinate of the treasure chest's top-left corner.
                 y: Y-coordinate of the treasure chest's top-left corner.
         """
-        super().__init__(size, x, y, pygame.image.load('../graphics/character/chest.png').convert_alpha())
+        super().__init__(size, x, y, import_image('../graphics/character/chest.png'))
 
 
 class AnimatedTile(Tile):
@@ -160,15 +151,18 @@ class AnimatedTile(Tile):
             self.frame_index = 0
         self.image = self.frames[int(self.frame_index)]
 
-    def update(self, x_shift, surface=None):
-        """Updates the position and animation of the tile based on the horizontal shift.
-
-            Parameters:
-                x_shift: Horizontal shift amount.
-                surface (optional): Surface to render the tile.
-        """
+    def update(self):
+        """Updates the animation of the tile."""
         self.animate()
-        self.rect.x += x_shift
+
+    def snapshot(self):
+        """Returns the position and animation state of the tile as a tuple, see restore."""
+        return tuple(self.rect), self.frames, self.frame_index, self.image
+
+    def restore(self, state):
+        """Puts the tile back into a state returned by snapshot."""
+        rect, self.frames, self.frame_index, self.image = state
+        self.rect.update(rect)
 
 
 class Coin(AnimatedTile):
@@ -3,6 +3,7 @@
     information to the player during gameplay.
 """
 import pygame
+from support import import_image
 
 
 class UI:
@@ -28,14 +29,14 @@ class UI:
         self.display_surface = surface
 
         # health
-        self.health_bar = pygame.image.load('../graphics/ui/health_bar.png').convert_alpha()
+        self.health_bar = import_image('../graphics/ui/health_bar.png')
         # where the healthbar starts
         self.health_bar_topleft = (54, 39)
         self.bar_max_width = 152
         self.bar_height = 4
 
         # coins
-        self.coin_img = pygame.image.load('../graphics/ui/coin.png').convert_alpha()
+        self.coin_img = import_image('../graphics/ui/coin.png')
         self.coin_rect = self.coin_img.get_rect(topleft=(50, 61))
         self.font = pygame.font.Font('../graphics/ui/ARCADEPI.TTF', 30)
 